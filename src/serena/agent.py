@@ -6,6 +6,7 @@ import multiprocessing
 import os
 import platform
 import sys
+import threading
 import webbrowser
 from collections.abc import Callable
 from logging import Logger
@@ -245,6 +246,12 @@ class SerenaAgent:
         # create executor for starting the language server and running tools in another thread
         # This executor is used to achieve linear task execution
         self._task_executor = TaskExecutor("SerenaAgentTaskExecutor")
+        # generations of the most recently requested (re)initialization of the language server manager and of the most
+        # recent one that has finished (successfully, with failure or via cancellation); no initialization is pending
+        # once the latter has caught up with the former
+        self._language_server_manager_condition = threading.Condition()
+        self._language_server_manager_requested_generation = 0
+        self._language_server_manager_finished_generation = 0
 
         # Initialize the prompt factory
         self.prompt_factory = SerenaPromptFactory()
@@ -306,6 +313,45 @@ class SerenaAgent:
             return self._active_project.language_server_manager
         return None
 
+    def wait_for_language_server_manager(self, timeout: float | None = None) -> LanguageServerManager | None:
+        """
+        Waits until a pending or running (re)initialization of the language server manager (e.g. as started by the activation
+        of a project) has completed. Returns immediately if no initialization is pending.
+
+        :param timeout: the maximum time to wait in seconds, or None to wait indefinitely
+        :return: the language server manager or None if it is not available (initialization failed or timed out)
+        """
+        with self._language_server_manager_condition:
+            # waits for the newest initialization, i.e. one requested while waiting supersedes the earlier one
+            self._language_server_manager_condition.wait_for(
+                lambda: self._language_server_manager_finished_generation >= self._language_server_manager_requested_generation,
+                timeout,
+            )
+        return self.get_language_server_manager()
+
+    def _begin_language_server_manager_initialization(self) -> int:
+        """
+        Registers a new pending (re)initialization of the language server manager.
+
+        :return: the generation of the initialization, which is to be passed to
+            `_finish_language_server_manager_initialization` once the initialization has finished
+        """
+        with self._language_server_manager_condition:
+            self._language_server_manager_requested_generation += 1
+            return self._language_server_manager_requested_generation
+
+    def _finish_language_server_manager_initialization(self, generation: int) -> None:
+        """
+        Marks the (re)initialization of the language server manager with the given generation as finished,
+        releasing waiters if no newer initialization is pending.
+
+        :param generation: the generation, as returned by `_begin_language_server_manager_initialization`
+        """
+        with self._language_server_manager_condition:
+            if generation > self._language_server_manager_finished_generation:
+                self._language_server_manager_finished_generation = generation
+            self._language_server_manager_condition.notify_all()
+
     def get_language_server_manager_or_raise(self) -> LanguageServerManager:
         language_server_manager = self.get_language_server_manager()
         if language_server_manager is None:
@@ -518,11 +564,18 @@ class SerenaAgent:
         def init_language_server_manager() -> None:
             # start the language server
             with LogTime("Language server initialization", logger=log):
-                self.reset_language_server_manager()
+                self._create_language_server_manager()
 
         # initialize the language server in the background (if in language server mode)
         if self.is_using_language_server():
-            self.issue_task(init_language_server_manager)
+            generation = self._begin_language_server_manager_initialization()
+            try:
+                task = self.issue_task(init_language_server_manager)
+            except BaseException:
+                self._finish_language_server_manager_initialization(generation)
+                raise
+            # the task's future is also completed if the task is cancelled before it is executed
+            task.future.add_done_callback(lambda _: self._finish_language_server_manager_initialization(generation))
 
         if self._project_activation_callback is not None:
             self._project_activation_callback()
@@ -633,6 +686,13 @@ class SerenaAgent:
         """
         Starts/resets the language server manager for the current project
         """
+        generation = self._begin_language_server_manager_initialization()
+        try:
+            self._create_language_server_manager()
+        finally:
+            self._finish_language_server_manager_initialization(generation)
+
+    def _create_language_server_manager(self) -> None:
         tool_timeout = self.serena_config.tool_timeout
         if tool_timeout is None or tool_timeout < 0:
             ls_timeout = None
@@ -139,6 +139,16 @@ class LanguageServerManager:
             ls = self._default_language_server
         return self._ensure_functional_ls(ls)
 
+    def get_language_server_for_language(self, language: Language) -> SolidLanguageServer | None:
+        """
+        :param language: the language
+        :return: the language server for the given language, or None if no language server is managed for it
+        """
+        ls = self._language_servers.get(language)
+        if ls is None:
+            return None
+        return self._ensure_functional_ls(ls)
+
     def _create_and_start_language_server(self, language: Language) -> SolidLanguageServer:
         if self._language_server_factory is None:
             raise ValueError(f"No language server factory available to create language server for {language}")
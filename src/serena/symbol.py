@@ -154,6 +154,13 @@ class NamePathMatcher(ToStringMixin):
     def _tostring_includes(self) -> list[str]:
         return ["_expr"]
 
+    @property
+    def name_pattern(self) -> str:
+        """
+        The pattern for the symbol's own name, i.e. the last segment of the name path pattern (without overload index)
+        """
+        return self._pattern_parts[-1]
+
     def matches_ls_symbol(self, symbol: "LanguageServerSymbol") -> bool:
         return self.matches_components(symbol.get_name_path_parts(), symbol.overload_idx)
 
@@ -356,15 +363,8 @@ class LanguageServerSymbol(Symbol, ToStringMixin):
         result = []
         name_path_matcher = NamePathMatcher(name_path_pattern, substring_matching)
 
-        def should_include(s: "LanguageServerSymbol") -> bool:
-            if include_kinds is not None and s.symbol_kind not in include_kinds:
-                return False
-            if exclude_kinds is not None and s.symbol_kind in exclude_kinds:
-                return False
-            return name_path_matcher.matches_ls_symbol(s)
-
         def traverse(s: "LanguageServerSymbol") -> None:
-            if should_include(s):
+            if s.matches(name_path_matcher, include_kinds=include_kinds, exclude_kinds=exclude_kinds):
                 result.append(s)
             for c in s.iter_children():
                 traverse(c)
@@ -372,6 +372,24 @@ class LanguageServerSymbol(Symbol, ToStringMixin):
         traverse(self)
         return result
 
+    def matches(
+        self,
+        name_path_matcher: NamePathMatcher,
+        include_kinds: Sequence[SymbolKind] | None = None,
+        exclude_kinds: Sequence[SymbolKind] | None = None,
+    ) -> bool:
+        """
+        :param name_path_matcher: the matcher for the name path pattern
+        :param include_kinds: if provided, only symbols of the given kinds match
+        :param exclude_kinds: if provided, symbols of the given kinds do not match
+        :return: whether this symbol matches the given name path pattern and kind filters
+        """
+        if include_kinds is not None and self.symbol_kind not in include_kinds:
+            return False
+        if exclude_kinds is not None and self.symbol_kind in exclude_kinds:
+            return False
+        return name_path_matcher.matches_ls_symbol(self)
+
     def to_dict(
         self,
         kind: bool = False,
@@ -407,9 +425,10 @@ class LanguageServerSymbol(Symbol, ToStringMixin):
             result["body_location"] = {"start_line": body_start_line, "end_line": body_end_line}
 
         if include_body:
-            if self.body is None:
+            body = self.body
+            if body is None:
                 log.warning("Requested body for symbol, but it is not present. The symbol might have been loaded with include_body=False.")
-            result["body"] = self.body
+            result["body"] = body
 
         def add_children(s: Self) -> list[dict[str, Any]]:
             children = []
@@ -498,6 +517,16 @@ class LanguageServerSymbolRetriever:
         """
         symbols: list[LanguageServerSymbol] = []
         for lang_server in self._ls_manager.iter_language_servers():
+            if not within_relative_path:
+                # use the language server's symbol name index (if any) instead of traversing the full symbol tree
+                name_path_matcher = NamePathMatcher(name_path_pattern, substring_matching)
+                candidates = lang_server.request_symbols_by_name(name_path_matcher.name_pattern, substring_matching=substring_matching)
+                if candidates is not None:
+                    for candidate in candidates:
+                        symbol = LanguageServerSymbol(candidate)
+                        if symbol.matches(name_path_matcher, include_kinds=include_kinds, exclude_kinds=exclude_kinds):
+                            symbols.append(symbol)
+                    continue
             symbol_roots = lang_server.request_full_symbol_tree(within_relative_path=within_relative_path)
             for root in symbol_roots:
                 symbols.extend(
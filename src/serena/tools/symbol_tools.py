@@ -133,6 +133,32 @@ class FindSymbolTool(Tool, ToolMarkerSymbolicRead):
             -1 means the default value from the config will be used.
         :return: a list of symbols (with locations) matching the name.
         """
+        symbol_dicts = self.find_symbol_dicts(
+            name_path_pattern,
+            depth=depth,
+            relative_path=relative_path,
+            include_body=include_body,
+            include_kinds=include_kinds,
+            exclude_kinds=exclude_kinds,
+            substring_matching=substring_matching,
+        )
+        result = self._to_json(symbol_dicts)
+        return self._limit_length(result, max_answer_chars)
+
+    def find_symbol_dicts(
+        self,
+        name_path_pattern: str,
+        depth: int = 0,
+        relative_path: str = "",
+        include_body: bool = False,
+        include_kinds: Sequence[int] | None = None,
+        exclude_kinds: Sequence[int] | None = None,
+        substring_matching: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Like :meth:`apply`, but returns the symbol dictionaries directly instead of their JSON representation,
+        for programmatic callers which would otherwise have to parse the JSON again.
+        """
         parsed_include_kinds: Sequence[SymbolKind] | None = [SymbolKind(k) for k in include_kinds] if include_kinds else None
         parsed_exclude_kinds: Sequence[SymbolKind] | None = [SymbolKind(k) for k in exclude_kinds] if exclude_kinds else None
         symbol_retriever = self.create_language_server_symbol_retriever()
@@ -143,9 +169,7 @@ class FindSymbolTool(Tool, ToolMarkerSymbolicRead):
             substring_matching=substring_matching,
             within_relative_path=relative_path,
         )
-        symbol_dicts = [_sanitize_symbol_dict(s.to_dict(kind=True, location=True, depth=depth, include_body=include_body)) for s in symbols]
-        result = self._to_json(symbol_dicts)
-        return self._limit_length(result, max_answer_chars)
+        return [_sanitize_symbol_dict(s.to_dict(kind=True, location=True, depth=depth, include_body=include_body)) for s in symbols]
 
 
 class FindReferencingSymbolsTool(Tool, ToolMarkerSymbolicRead):
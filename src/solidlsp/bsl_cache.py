@@ -4,7 +4,7 @@ In-memory кеш для BSL символов (аналог LokiJS).
 """
 
 import re
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Any
 
 from solidlsp.bsl_parser import BSLMethod, BSLModuleVar, BSLCallPosition
@@ -55,6 +55,7 @@ class BSLCache:
         self._method_name_index: dict[str, list[int]] = {}  # name -> list of indices
         self._method_module_index: dict[str, list[int]] = {}  # module -> list of indices
         self._method_export_index: list[int] = []  # indices of exported methods
+        self._method_file_index: dict[str, list[int]] = {}  # filename -> list of indices
     
     def add_method(self, method: BSLMethod, filename: str, module: str = "") -> None:
         """
@@ -82,6 +83,10 @@ class BSLCache:
         
         if method.is_export:
             self._method_export_index.append(index)
+        
+        if filename not in self._method_file_index:
+            self._method_file_index[filename] = []
+        self._method_file_index[filename].append(index)
     
     def add_module_var(self, var: BSLModuleVar, filename: str) -> None:
         """
@@ -263,6 +268,23 @@ class BSLCache:
         """
         return self.calls.get(call_name, []).copy()
     
+    def get_method_files(self) -> list[str]:
+        """
+        Получить список файлов, для которых в кеше есть методы.
+        
+        :return: Список относительных путей к файлам
+        """
+        return list(self._method_file_index.keys())
+    
+    def get_file_methods(self, filename: str) -> list[BSLMethod]:
+        """
+        Получить методы файла по индексу файлов (без обхода всего списка методов).
+        
+        :param filename: Относительный путь к файлу
+        :return: Список методов файла в порядке добавления
+        """
+        return [self.methods[idx].method for idx in self._method_file_index.get(filename, [])]
+    
     def find_methods_by_module(self, module: str) -> list[BSLMethodInfo]:
         """
         Найти все методы в указанном модуле.
@@ -293,6 +315,7 @@ class BSLCache:
         self._method_name_index.clear()
         self._method_module_index.clear()
         self._method_export_index.clear()
+        self._method_file_index.clear()
     
     def remove_file_data(self, filename: str) -> None:
         """
@@ -301,18 +324,14 @@ class BSLCache:
         :param filename: Относительный путь к файлу
         """
         # 1. Удаление методов
-        # Собираем индексы методов для данного файла (начиная с конца, чтобы не сломать индексы)
-        indices_to_remove: list[int] = []
-        for idx in range(len(self.methods) - 1, -1, -1):
-            if self.methods[idx].filename == filename:
-                indices_to_remove.append(idx)
-        
-        # Удаляем методы начиная с конца списка
-        for idx in indices_to_remove:
-            self.methods.pop(idx)
-        
-        # Перестраиваем все индексы после удаления
-        self._rebuild_indices()
+        # Индексы методов файла берем из индекса по файлам (удаляем с конца, чтобы не сломать индексы)
+        indices_to_remove = self._method_file_index.get(filename)
+        if indices_to_remove:
+            for idx in reversed(indices_to_remove):
+                self.methods.pop(idx)
+            
+            # Перестраиваем все индексы после удаления
+            self._rebuild_indices()
         
         # 2. Удаление переменных модуля
         self.module_vars.pop(filename, None)
@@ -344,6 +363,7 @@ class BSLCache:
         self._method_name_index.clear()
         self._method_module_index.clear()
         self._method_export_index.clear()
+        self._method_file_index.clear()
         
         for idx, method_info in enumerate(self.methods):
             method = method_info.method
@@ -364,6 +384,11 @@ class BSLCache:
             # Индекс экспортированных методов
             if method.is_export:
                 self._method_export_index.append(idx)
+            
+            # Индекс по файлу
+            if method_info.filename not in self._method_file_index:
+                self._method_file_index[method_info.filename] = []
+            self._method_file_index[method_info.filename].append(idx)
     
     def get_stats(self) -> dict[str, int]:
         """
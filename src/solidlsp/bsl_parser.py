@@ -4,9 +4,12 @@ Python парсер BSL кода для массовой индексации.
 """
 
 import re
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from typing import Any
 
+_NEWLINE_PATTERN = re.compile('\n')
+
 
 @dataclass
 class BSLParam:
@@ -113,12 +116,14 @@ class BSLParser:
         """
         result = BSLParseResult()
         lines = source.split('\n')
+        # Таблица смещений начала строк: номер строки по позиции в тексте находится двоичным поиском
+        line_starts = [0, *(match.end() for match in _NEWLINE_PATTERN.finditer(source))]
         
         # Извлекаем переменные модуля
-        result.module_vars = self._parse_module_vars(source, lines)
+        result.module_vars = self._parse_module_vars(source, lines, line_starts)
         
         # Извлекаем методы (процедуры и функции)
-        result.methods = self._parse_methods(source, lines)
+        result.methods = self._parse_methods(source, lines, line_starts)
         
         # Извлекаем вызовы на уровне модуля (вне методов)
         result.global_calls = self._parse_global_calls(source, lines, result.methods)
@@ -129,13 +134,18 @@ class BSLParser:
         
         return result
     
-    def _parse_module_vars(self, source: str, lines: list[str]) -> dict[str, BSLModuleVar]:
+    @staticmethod
+    def _line_at(line_starts: list[int], pos: int) -> int:
+        """Возвращает номер строки (0-based), содержащей позицию pos, по таблице смещений начала строк."""
+        return bisect_right(line_starts, pos) - 1
+    
+    def _parse_module_vars(self, source: str, lines: list[str], line_starts: list[int]) -> dict[str, BSLModuleVar]:
         """Извлекает переменные модуля."""
         vars_dict: dict[str, BSLModuleVar] = {}
         
         for match in self.MODULE_VAR_PATTERN.finditer(source):
             var_name = match.group(1)
-            var_line = source[:match.start()].count('\n')
+            var_line = self._line_at(line_starts, match.start())
             var_text = match.group(0)
             is_export = 'Экспорт' in var_text or 'экспорт' in var_text
             
@@ -150,19 +160,19 @@ class BSLParser:
         
         return vars_dict
     
-    def _parse_methods(self, source: str, lines: list[str]) -> list[BSLMethod]:
+    def _parse_methods(self, source: str, lines: list[str], line_starts: list[int]) -> list[BSLMethod]:
         """Извлекает процедуры и функции."""
         methods: list[BSLMethod] = []
         
         # Находим все процедуры
         for match in self.PROC_PATTERN.finditer(source):
-            method = self._parse_method_from_match(source, lines, match, is_proc=True)
+            method = self._parse_method_from_match(source, lines, line_starts, match, is_proc=True)
             if method:
                 methods.append(method)
         
         # Находим все функции
         for match in self.FUNC_PATTERN.finditer(source):
-            method = self._parse_method_from_match(source, lines, match, is_proc=False)
+            method = self._parse_method_from_match(source, lines, line_starts, match, is_proc=False)
             if method:
                 methods.append(method)
         
@@ -175,14 +185,15 @@ class BSLParser:
         self,
         source: str,
         lines: list[str],
+        line_starts: list[int],
         match: re.Match[str],
         is_proc: bool
     ) -> BSLMethod | None:
         """Создает BSLMethod из найденного совпадения."""
         method_name = match.group(1)
         start_pos = match.start()
-        # Вычисляем номер строки: количество \n до позиции совпадения
-        start_line = source[:start_pos].count('\n')
+        # Вычисляем номер строки по таблице смещений (без копирования текста до позиции совпадения)
+        start_line = self._line_at(line_starts, start_pos)
         
         # Убеждаемся, что start_line указывает на строку, содержащую совпадение
         # Если совпадение находится сразу после \n, то start_line уже правильный
@@ -208,7 +219,7 @@ class BSLParser:
         params = self._extract_params(source, start_pos, lines, start_line)
         
         # Находим конец процедуры/функции
-        end_line = self._find_method_end(source, start_line, is_proc)
+        end_line = self._find_method_end(lines, start_line, is_proc)
         if end_line is None:
             return None
         
@@ -285,9 +296,8 @@ class BSLParser:
         
         return params
     
-    def _find_method_end(self, source: str, start_line: int, is_proc: bool) -> int | None:
-        """Находит строку с концом процедуры/функции."""
-        lines = source.split('\n')
+    def _find_method_end(self, lines: list[str], start_line: int, is_proc: bool) -> int | None:
+        """Находит строку с концом процедуры/функции по уже разбитому на строки тексту."""
         end_pattern = self.PROC_END_PATTERN if is_proc else self.FUNC_END_PATTERN
         
         # Ищем соответствующий конец, учитывая вложенность
@@ -388,7 +398,6 @@ class BSLParser:
         
         # Извлекаем код метода
         method_lines = lines[method.line:method.endline + 1]
-        method_text = '\n'.join(method_lines)
         
         # Ищем вызовы в коде метода
         for line_offset, line in enumerate(method_lines):
@@ -3,17 +3,25 @@ Provides BSL (1C:Enterprise) specific instantiation of the LanguageServer class
 Contains various configurations and settings specific to BSL (1C) development.
 """
 
+import contextlib
+import functools
 import hashlib
 import logging
+import mmap
 import os
 import pathlib
 import platform
+import re
 import shutil
+import tempfile
 import threading
 import time
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any
+from collections.abc import Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any
+from urllib.parse import quote
 
 from overrides import override
 
@@ -22,11 +30,109 @@ from solidlsp.ls import DocumentSymbols, SolidLanguageServer
 from solidlsp.ls_config import LanguageServerConfig
 from solidlsp.lsp_protocol_handler.lsp_types import InitializeParams
 from solidlsp.lsp_protocol_handler.server import ProcessLaunchInfo
-from solidlsp.ls_utils import TextUtils
+from solidlsp.ls_utils import InvalidTextLocationError, TextUtils
 from solidlsp.settings import SolidLSPSettings
 
+if TYPE_CHECKING:
+    from solidlsp.bsl_parser import BSLParseResult
+
 log = logging.getLogger(__name__)
 
+_NEWLINE_PATTERN = re.compile("\n")
+_BYTES_NEWLINE_PATTERN = re.compile(b"\n")
+
+# Common 1C build and cache directories (множество строится один раз, проверка вхождения - по хешу)
+_BSL_IGNORED_DIRNAMES = frozenset(
+    {
+        "build",
+        ".bsl-language-server",
+        ".vscode",
+        ".idea",
+        "bin",
+        "out",
+        "oscript_modules",
+        ".cursor",
+        ".serena",
+        ".git",
+    }
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _read_body_source(absolute_file_path: str, mtime_ns: int, size: int) -> tuple[str, list[int]]:
+    """
+    Читает файл для извлечения тел методов и вычисляет смещения начала строк.
+    Результат кешируется для нескольких последних файлов: тела всех методов одного файла
+    извлекаются из одного прочтения. Время модификации и размер входят в ключ кеша,
+    чтобы изменённый файл был прочитан заново.
+
+    :param absolute_file_path: Абсолютный путь к файлу
+    :param mtime_ns: Время модификации файла в наносекундах (часть ключа кеша)
+    :param size: Размер файла (часть ключа кеша)
+    :return: Кортеж (содержимое файла, смещения начала строк)
+    """
+    with open(absolute_file_path, "r", encoding="utf-8", errors="ignore") as f:
+        file_content = f.read()
+    return file_content, BSLLanguageServer._compute_line_offsets(file_content)
+
+
+def _parse_bsl_source(source: str) -> "BSLParseResult":
+    """
+    Парсит исходный текст BSL модуля.
+    Функция уровня модуля, чтобы ее можно было выполнять в процессах пула при параллельном парсинге.
+
+    :param source: Текст модуля с нормализованными окончаниями строк
+    :return: Результат парсинга
+    """
+    from solidlsp.bsl_parser import BSLParser
+
+    return BSLParser().parse(source)
+
+
+class BSLMethodSymbol(dict):
+    """
+    UnifiedSymbolInformation метода BSL с ленивым телом: ключ "body" не хранится в словаре
+    (и в сохраняемом кеше), а читается из файла по диапазону символа при обращении.
+    """
+
+    def __missing__(self, key: str) -> Any:
+        if key == "body":
+            return self._load_body()
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        # Тело не сохраняется в символе: символ живет в кеше DocumentSymbols, и записанное вызывающим кодом тело
+        # (например, в request_containing_symbol) устарело бы при изменении файла и попало бы в сохраняемый кеш
+        if key == "body":
+            return
+        super().__setitem__(key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "body" and not dict.__contains__(self, "body"):
+            body = self._load_body()
+            return default if body is None else body
+        return super().get(key, default)
+
+    def _load_body(self) -> str | None:
+        location = self["location"]
+        symbol_range = self["range"]
+        absolute_file_path = location["absolutePath"]
+        try:
+            stat = os.stat(absolute_file_path)
+            file_content, line_offsets = _read_body_source(absolute_file_path, stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            log.debug(f"Failed to read body of {self['name']} from {location['relativePath']}: {e}")
+            return None
+        end_line = symbol_range["end"]["line"]
+        if end_line >= len(line_offsets):
+            # Файл изменился после вычисления диапазона символа (время модификации в ключе обновляет только текст)
+            log.debug(
+                f"Range of {self['name']} (end line {end_line}) is beyond the end of {location['relativePath']} "
+                f"({len(line_offsets)} lines); the file has changed since indexing"
+            )
+            return None
+        return BSLLanguageServer._extract_method_body(file_content, line_offsets, symbol_range["start"]["line"], end_line)
+
 
 class BSLLanguageServer(SolidLanguageServer):
     """
@@ -40,6 +146,12 @@ class BSLLanguageServer(SolidLanguageServer):
     All configuration is automatic - no manual setup required.
     """
 
+    # Максимальное число потоков для параллельного построения правок переименования по файлам
+    RENAME_MAX_WORKERS = 8
+    # Размер файла (в байтах), начиная с которого файл не декодируется целиком: декодируются только нужные строки
+    # (одиночная строка читается через mmap)
+    MMAP_LINE_READ_THRESHOLD = 64 * 1024
+
     def __init__(self, config: LanguageServerConfig, repository_root_path: str, solidlsp_settings: SolidLSPSettings):
         """
         Creates a BSLLanguageServer instance. This class is not meant to be instantiated directly.
@@ -71,6 +183,8 @@ class BSLLanguageServer(SolidLanguageServer):
         
         # Локальный парсер всегда включен
         self.file_read_parallelism = custom_settings.get("file_read_parallelism", 500)
+        # Число процессов для парсинга при индексации (0 или 1 - парсинг в потоках чтения файлов)
+        self.parse_processes = custom_settings.get("parse_processes", 0)
         
         # In-memory кеш для локального парсера (всегда включен)
         # Результаты сохраняются в стандартный _document_symbols_cache
@@ -80,7 +194,22 @@ class BSLLanguageServer(SolidLanguageServer):
         self._file_content_cache: dict[str, str] = {}
         # Отслеживание уже преобразованных файлов для инкрементального преобразования
         self._converted_files: set[str] = set()
-        
+        # Кеш абсолютных путей (относительный путь -> абсолютный путь)
+        self._abs_path_cache: dict[str, str] = {}
+        # URI корня проекта и кеш URI файлов (относительный путь -> URI), чтобы не вызывать Path.as_uri() для каждого символа
+        self._root_uri = pathlib.Path(repository_root_path).as_uri()
+        self._root_uri_prefix = self._root_uri if self._root_uri.endswith("/") else self._root_uri + "/"
+        self._uri_cache: dict[str, str] = {}
+        # Множество известных BSL файлов, заполняется при обходе проекта в _find_all_bsl_files
+        self._known_files: set[str] = set()
+        # Индекс имён символов полного дерева символов (имя -> список (позиция при обходе дерева в глубину, символ)),
+        # строится лениво при поиске и перестраивается после изменения кешей символов
+        self._symbol_name_index: dict[str, list[tuple[int, ls_types.UnifiedSymbolInformation]]] | None = None
+        self._symbol_name_index_seq = -1
+
+        # Устанавливается после завершения первоначальной проверки и обновления кеша при запуске сервера
+        self._cache_ready = threading.Event()
+
         # Для совместимости с существующим кодом (если используется где-то еще)
         self._processing_files: set[str] = set()
         self._indexing_lock = threading.Lock()
@@ -95,20 +224,7 @@ class BSLLanguageServer(SolidLanguageServer):
 
     def is_ignored_dirname(self, dirname: str) -> bool:
         """Define BSL-specific directories to ignore."""
-        # Common 1C build and cache directories
-        bsl_ignored_dirs = [
-            "build",
-            ".bsl-language-server",
-            ".vscode",
-            ".idea",
-            "bin",
-            "out",
-            "oscript_modules",
-            ".cursor",
-            ".serena",
-            ".git",
-        ]
-        return super().is_ignored_dirname(dirname) or dirname in bsl_ignored_dirs
+        return super().is_ignored_dirname(dirname) or dirname in _BSL_IGNORED_DIRNAMES
 
     def _setup_runtime_dependencies(self, config: LanguageServerConfig, solidlsp_settings: SolidLSPSettings) -> list[str]:
         """
@@ -287,11 +403,49 @@ class BSLLanguageServer(SolidLanguageServer):
         except Exception as e:
             log.error(f"Error during cache update: {e}", exc_info=True)
             # Don't fail server startup if cache update fails
+        finally:
+            self._cache_ready.set()
         
         # Mark server as ready immediately since we don't need to wait for LSP initialization
         log.info("BSL Language Server: Local cache mode ready")
         self.server_ready.set()
 
+    def wait_cache_ready(self, timeout: float | None = None) -> bool:
+        """
+        Ожидает завершения первоначальной проверки и обновления кеша (индексации) при запуске сервера.
+        
+        :param timeout: Максимальное время ожидания в секундах (None - без ограничения)
+        :return: True, если кеш готов, False, если истекло время ожидания
+        """
+        return self._cache_ready.wait(timeout)
+
+    def _iter_bsl_files(self, start_dir: str | None = None) -> Iterator[tuple[str, str]]:
+        """
+        Лениво обходит дерево каталогов через os.scandir и выдает найденные .bsl файлы.
+        Записи DirEntry уже содержат тип файла, поэтому отдельный stat для каждого файла не выполняется.
+        Игнорируемые директории (is_ignored_dirname) не обходятся, символические ссылки на директории
+        не раскрываются (как в os.walk по умолчанию).
+
+        :param start_dir: Абсолютный путь к директории, с которой начинается обход (по умолчанию корень проекта)
+        :return: Итератор пар (относительный путь от корня проекта с '/', абсолютный путь)
+        """
+        root_prefix_len = len(os.path.join(self.repository_root_path, ""))
+        pending_dirs = [start_dir or self.repository_root_path]
+        while pending_dirs:
+            try:
+                with os.scandir(pending_dirs.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            if not entry.is_symlink() and not self.is_ignored_dirname(entry.name):
+                                pending_dirs.append(entry.path)
+                        # Собираем только .bsl файлы (не .os!)
+                        elif entry.name.endswith(".bsl"):
+                            # Нормализуем путь для Windows (заменяем \ на /)
+                            yield entry.path[root_prefix_len:].replace("\\", "/"), entry.path
+            except OSError as e:
+                # Недоступные директории пропускаем, как os.walk
+                log.debug(f"BSL: Cannot scan directory: {e}")
+
     def _find_all_bsl_files(self) -> list[str]:
         """
         Рекурсивно собирает все BSL файлы в проекте.
@@ -300,29 +454,138 @@ class BSLLanguageServer(SolidLanguageServer):
         """
         bsl_files: list[str] = []
         
-        for root, dirs, files in os.walk(self.repository_root_path):
-            # Фильтруем игнорируемые директории
-            dirs[:] = [d for d in dirs if not self.is_ignored_dirname(d)]
+        for rel_path, abs_path in self._iter_bsl_files():
+            # Проверяем, не игнорируется ли файл
+            if self.is_ignored_path(rel_path):
+                continue
             
-            for file in files:
-                # Собираем только .bsl файлы (не .os!)
-                if not file.endswith('.bsl'):
-                    continue
-                
-                abs_path = os.path.join(root, file)
-                rel_path = os.path.relpath(abs_path, self.repository_root_path)
-                
-                # Нормализуем путь для Windows (заменяем \ на /)
-                rel_path = rel_path.replace('\\', '/')
-                
-                # Проверяем, не игнорируется ли файл
-                if self.is_ignored_path(rel_path):
-                    continue
-                
-                bsl_files.append(rel_path)
-        
+            bsl_files.append(rel_path)
+            self._abs_path_cache[rel_path] = abs_path
+
+        # Запоминаем найденные файлы, чтобы не проверять существование через os.path.exists
+        self._known_files = set(bsl_files)
+
         return bsl_files
 
+    def _get_abs_path(self, relative_file_path: str) -> str:
+        """
+        Возвращает абсолютный путь к файлу, кешируя результат os.path.join.
+
+        :param relative_file_path: Относительный путь к файлу
+        :return: Абсолютный путь к файлу
+        """
+        abs_path = self._abs_path_cache.get(relative_file_path)
+        if abs_path is None:
+            abs_path = os.path.join(self.repository_root_path, relative_file_path)
+            self._abs_path_cache[relative_file_path] = abs_path
+        return abs_path
+
+    def _get_file_uri(self, relative_file_path: str) -> str:
+        """
+        Возвращает URI файла, собирая его из заранее вычисленного URI корня проекта
+        и закодированного относительного пути (результат кешируется).
+
+        :param relative_file_path: Относительный путь к файлу или директории
+        :return: URI файла (как pathlib.Path(abs_path).as_uri())
+        """
+        uri = self._uri_cache.get(relative_file_path)
+        if uri is None:
+            # Нормализуем путь так же, как pathlib ("." и пустые компоненты отбрасываются), чтобы URI корня
+            # и директорий совпадали с результатом Path.as_uri()
+            normalized_path = pathlib.PurePosixPath(relative_file_path.replace(os.sep, "/")).as_posix()
+            uri = self._root_uri if normalized_path == "." else self._root_uri_prefix + quote(normalized_path)
+            self._uri_cache[relative_file_path] = uri
+        return uri
+
+    def _file_exists(self, relative_file_path: str) -> bool:
+        """
+        Проверяет существование файла: сначала по множеству известных файлов (без системного вызова),
+        и только для неизвестных файлов - через файловую систему.
+
+        :param relative_file_path: Относительный путь к файлу
+        :return: True если файл существует
+        """
+        if relative_file_path in self._known_files:
+            return True
+        if os.path.exists(self._get_abs_path(relative_file_path)):
+            self._known_files.add(relative_file_path)
+            return True
+        return False
+
+    def _read_file_content(self, relative_file_path: str) -> tuple[str, list[int]]:
+        """
+        Читает содержимое файла с диска (в кодировке проекта) и вычисляет смещения начала строк.
+        Содержимое всегда читается заново, чтобы правки не затирали изменения, сделанные в файле извне.
+
+        :param relative_file_path: Относительный путь к файлу
+        :return: Кортеж (содержимое файла, смещения начала строк)
+        """
+        with open(self._get_abs_path(relative_file_path), 'r', encoding=self._encoding) as f:
+            file_content = f.read()
+        return file_content, self._compute_line_offsets(file_content)
+
+    def _read_file_line(
+        self, relative_file_path: str, line: int, lines_cache: dict[str, tuple[str | bytes, list[int]]] | None = None
+    ) -> str | None:
+        """
+        Читает одну строку файла (utf-8, ошибки декодирования игнорируются). Небольшие файлы читаются целиком,
+        для больших файлов декодируется только нужная строка.
+
+        :param relative_file_path: Относительный путь к файлу
+        :param line: Номер строки (0-based)
+        :param lines_cache: Необязательный кеш прочитанных файлов (относительный путь -> (содержимое, смещения строк))
+            в рамках одного запроса, чтобы файл с несколькими нужными строками читался один раз.
+            Большие файлы хранятся в нём недекодированными (байты и смещения строк в байтах)
+        :return: Строка без символа перевода строки или None, если строки нет в файле
+        """
+        cached = lines_cache.get(relative_file_path) if lines_cache is not None else None
+        if cached is None:
+            abs_path = self._get_abs_path(relative_file_path)
+            if os.path.getsize(abs_path) >= self.MMAP_LINE_READ_THRESHOLD:
+                # Одиночная строка без кеша - через mmap, без чтения всего файла
+                if lines_cache is None:
+                    return self._read_file_line_mmap(abs_path, line)
+                with open(abs_path, "rb") as f:
+                    raw_content = f.read()
+                cached = (raw_content, [0, *(match.end() for match in _BYTES_NEWLINE_PATTERN.finditer(raw_content))])
+            else:
+                with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+                    file_content = f.read()
+                cached = (file_content, self._compute_line_offsets(file_content))
+            if lines_cache is not None:
+                lines_cache[relative_file_path] = cached
+        
+        content, line_offsets = cached
+        if line >= len(line_offsets):
+            return None
+        if isinstance(content, bytes):
+            raw_line = content[line_offsets[line] : self._line_end_offset(content, line_offsets, line)]
+            return raw_line.removesuffix(b"\r").decode("utf-8", errors="ignore")
+        return self._extract_method_body(content, line_offsets, line, line)
+
+    @staticmethod
+    def _read_file_line_mmap(abs_path: str, line: int) -> str | None:
+        """
+        Читает одну строку большого файла через mmap, декодируя только эту строку.
+
+        :param abs_path: Абсолютный путь к файлу
+        :param line: Номер строки (0-based)
+        :return: Строка без символа перевода строки или None, если строки нет в файле
+        """
+        with open(abs_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            for _ in range(line):
+                start = mm.find(b'\n', start) + 1
+                if start == 0:
+                    return None
+            end = mm.find(b'\n', start)
+            if end == -1:
+                end = len(mm)
+            raw_line = mm[start:end]
+        if raw_line.endswith(b'\r'):
+            raw_line = raw_line[:-1]
+        return raw_line.decode("utf-8", errors="ignore")
+
     def _find_files_to_index(self, all_files: list[str]) -> list[str]:
         """
         Определяет файлы, которые нужно проиндексировать (новые или измененные).
@@ -365,6 +628,20 @@ class BSLLanguageServer(SolidLanguageServer):
         
         return files_to_index
 
+    def _load_document_symbols_cache(self) -> None:
+        """
+        Загружает кеш символов документов и приводит ключи старого формата (relative_file_path, None) к строкам.
+        После загрузки ключи кеша всегда являются относительными путями к файлам.
+        """
+        super()._load_document_symbols_cache()
+        if any(isinstance(cache_key, tuple) for cache_key in self._document_symbols_cache):
+            self._document_symbols_cache = {
+                (cache_key[0] if isinstance(cache_key, tuple) else cache_key): value
+                for cache_key, value in self._document_symbols_cache.items()
+            }
+            # сохраняем кеш в новом формате при следующей записи
+            self._document_symbols_cache_is_modified = True
+
     def _remove_deleted_files_from_cache(self, existing_files: list[str]) -> int:
         """
         Удаляет из кеша файлы, которых больше нет в файловой системе.
@@ -378,19 +655,13 @@ class BSLLanguageServer(SolidLanguageServer):
         # Создаем копию ключей кеша, чтобы не изменять словарь во время итерации
         cache_keys = list(self._document_symbols_cache.keys())
         
-        for cache_key in cache_keys:
-            # Обрабатываем оба формата ключа: строка или tuple
-            if isinstance(cache_key, tuple):
-                relative_file_path = cache_key[0]
-            else:
-                relative_file_path = cache_key
-            
+        for relative_file_path in cache_keys:
             # Проверяем, существует ли файл
             if relative_file_path not in existing_files_set:
                 # Файл удален, удаляем из кеша
                 try:
                     with self._symbol_caches_transaction(raw=True, document=True):
-                        del self._document_symbols_cache[cache_key]
+                        del self._document_symbols_cache[relative_file_path]
                         self._raw_document_symbols_cache.pop(relative_file_path, None)
                     
                     # Удаляем из local_cache
@@ -400,9 +671,14 @@ class BSLLanguageServer(SolidLanguageServer):
                     # Удаляем из converted_files
                     self._converted_files.discard(relative_file_path)
                     
-                    # Удаляем из file_content_cache
+                    # Удаляем из кешей содержимого файлов
                     self._file_content_cache.pop(relative_file_path, None)
-                    
+
+                    # Удаляем из кеша путей
+                    self._known_files.discard(relative_file_path)
+                    self._abs_path_cache.pop(relative_file_path, None)
+                    self._uri_cache.pop(relative_file_path, None)
+
                     removed_count += 1
                     log.debug(f"Removed deleted file from cache: {relative_file_path}")
                 
@@ -510,20 +786,26 @@ class BSLLanguageServer(SolidLanguageServer):
         for key in sample_keys:
             log.debug(f"BSL:   - Key type: {type(key)}, value: {key}")
         
+        # Префикс относительного пути для фильтрации по within_relative_path (вычисляется один раз, а не для каждого файла)
+        # Пустая строка "" означает поиск во всем проекте, не фильтруем
+        within_prefix: str | None = None
+        if within_relative_path is not None and within_relative_path != "":
+            within_path = Path(within_relative_path)
+            # Если within_path абсолютный, преобразуем его в относительный для сравнения
+            if within_path.is_absolute():
+                try:
+                    within_path = within_path.relative_to(Path(self.repository_root_path))
+                except ValueError:
+                    # Если путь не находится внутри проекта, пропускаем фильтрацию
+                    pass
+            within_prefix = str(within_path)
+        
         # Собираем все файлы из кеша
         cached_files: dict[str, tuple[str, DocumentSymbols]] = {}
         ignored_count = 0
         filtered_by_path_count = 0
         
-        for cache_key, (file_hash, document_symbols) in self._document_symbols_cache.items():
-            # Обрабатываем оба формата ключа: строка или tuple (для обратной совместимости)
-            if isinstance(cache_key, tuple):
-                # Старый формат: (relative_file_path, None)
-                relative_file_path = cache_key[0]
-            else:
-                # Новый формат: relative_file_path (строка)
-                relative_file_path = cache_key
-            
+        for relative_file_path, (file_hash, document_symbols) in self._document_symbols_cache.items():
             # Проверяем, не игнорируется ли путь
             if self.is_ignored_path(relative_file_path):
                 ignored_count += 1
@@ -533,30 +815,10 @@ class BSLLanguageServer(SolidLanguageServer):
                 continue
             
             # Фильтруем по within_relative_path, если указан (для директории)
-            # Пустая строка "" означает поиск во всем проекте, не фильтруем
-            if within_relative_path is not None and within_relative_path != "":
-                try:
-                    rel_path = Path(relative_file_path)
-                    within_path = Path(within_relative_path)
-                    
-                    # Если within_path абсолютный, преобразуем его в относительный для сравнения
-                    if within_path.is_absolute():
-                        try:
-                            within_path = within_path.relative_to(Path(self.repository_root_path))
-                        except ValueError:
-                            # Если путь не находится внутри проекта, пропускаем фильтрацию
-                            pass
-                    
-                    # Проверяем, что файл находится внутри указанной директории
-                    if not (str(rel_path).startswith(str(within_path) + os.sep) or 
-                            str(rel_path) == str(within_path) or
-                            str(rel_path).startswith(str(within_path))):
-                        filtered_by_path_count += 1
-                        log.debug(f"BSL: Filtered out by within_relative_path: {relative_file_path} (within: {within_relative_path})")
-                        continue
-                except Exception as e:
-                    log.debug(f"BSL: Error filtering path {relative_file_path}: {e}")
-                    continue
+            if within_prefix is not None and not os.path.normpath(relative_file_path).startswith(within_prefix):
+                filtered_by_path_count += 1
+                log.debug(f"BSL: Filtered out by within_relative_path: {relative_file_path} (within: {within_relative_path})")
+                continue
             
             cached_files[relative_file_path] = (file_hash, document_symbols)
         
@@ -581,7 +843,7 @@ class BSLLanguageServer(SolidLanguageServer):
                 file_content = self._file_content_cache[relative_file_path]
             else:
                 # Читаем файл, если нет в кеше
-                abs_path = os.path.join(self.repository_root_path, relative_file_path)
+                abs_path = self._get_abs_path(relative_file_path)
                 try:
                     with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
                         file_content = f.read()
@@ -602,9 +864,9 @@ class BSLLanguageServer(SolidLanguageServer):
                 range=file_range,
                 selectionRange=file_range,
                 location=ls_types.Location(
-                    uri=str(pathlib.Path(os.path.join(self.repository_root_path, relative_file_path)).as_uri()),
+                    uri=self._get_file_uri(relative_file_path),
                     range=file_range,
-                    absolutePath=str(os.path.join(self.repository_root_path, relative_file_path)),
+                    absolutePath=str(self._get_abs_path(relative_file_path)),
                     relativePath=relative_file_path,
                 ),
                 children=file_root_nodes,
@@ -642,13 +904,13 @@ class BSLLanguageServer(SolidLanguageServer):
                         break
                     
                     dir_path_obj = Path(current_path)
-                    dir_abs_path = os.path.join(self.repository_root_path, current_path)
+                    dir_abs_path = self._get_abs_path(current_path)
                     
                     dir_symbol = ls_types.UnifiedSymbolInformation(  # type: ignore
                         name=dir_path_obj.name if current_path != "." else os.path.basename(self.repository_root_path),
                         kind=ls_types.SymbolKind.Package,
                         location=ls_types.Location(
-                            uri=str(pathlib.Path(dir_abs_path).as_uri()),
+                            uri=self._get_file_uri(current_path),
                             range={"start": {"line": 0, "character": 0}, "end": {"line": 0, "character": 0}},
                             absolutePath=dir_abs_path,
                             relativePath=current_path,
@@ -691,6 +953,42 @@ class BSLLanguageServer(SolidLanguageServer):
         log.debug(f"BSL: Built symbol tree from cache with {len(cached_files)} files in {len(directory_structure)} directories")
         return result
 
+    def _get_symbol_name_index(self) -> dict[str, list[tuple[int, ls_types.UnifiedSymbolInformation]]]:
+        """
+        Возвращает индекс имён символов полного дерева символов. Индекс строится при первом обращении
+        и перестраивается, если кеши символов изменились с момента его построения.
+        
+        :return: Словарь имя символа -> список (позиция при обходе дерева в глубину, символ)
+        """
+        mutation_seq = self._symbol_caches_mutation_seq
+        if self._symbol_name_index is not None and self._symbol_name_index_seq == mutation_seq:
+            return self._symbol_name_index
+        
+        symbol_name_index: dict[str, list[tuple[int, ls_types.UnifiedSymbolInformation]]] = defaultdict(list)
+        position = 0
+        # Обход в глубину в том же порядке, что и при поиске по дереву (узел, затем его дочерние символы)
+        stack = list(reversed(self.request_full_symbol_tree()))
+        while stack:
+            symbol = stack.pop()
+            symbol_name_index[symbol["name"]].append((position, symbol))
+            position += 1
+            stack.extend(reversed(symbol.get("children", [])))
+        
+        self._symbol_name_index = dict(symbol_name_index)
+        self._symbol_name_index_seq = mutation_seq
+        log.debug(f"BSL: Built symbol name index with {position} symbols and {len(self._symbol_name_index)} distinct names")
+        return self._symbol_name_index
+
+    @override
+    def request_symbols_by_name(self, name: str, substring_matching: bool = False) -> list[ls_types.UnifiedSymbolInformation] | None:
+        symbol_name_index = self._get_symbol_name_index()
+        if not substring_matching:
+            return [symbol for _, symbol in symbol_name_index.get(name, [])]
+        
+        matches = [entry for symbol_name, entries in symbol_name_index.items() if name in symbol_name for entry in entries]
+        matches.sort(key=lambda entry: entry[0])
+        return [symbol for _, symbol in matches]
+
     def _compute_file_hash(self, relative_file_path: str) -> str:
         """
         Быстро вычисляет хеш файла для проверки изменений.
@@ -700,15 +998,20 @@ class BSLLanguageServer(SolidLanguageServer):
         :param relative_file_path: Относительный путь к файлу
         :return: MD5 хеш содержимого файла (нормализованного текста в UTF-8)
         """
-        abs_path = os.path.join(self.repository_root_path, relative_file_path)
+        abs_path = self._get_abs_path(relative_file_path)
         try:
-            # Читаем файл в текстовом режиме и нормализуем окончания строк
-            with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-            # Нормализуем окончания строк (как в LSPFileBuffer)
-            content = content.replace("\r\n", "\n").replace("\r", "\n")
-            # Вычисляем хеш от нормализованного текста в UTF-8 (как в LSPFileBuffer.content_hash)
-            return hashlib.md5(content.encode("utf-8")).hexdigest()
+            # Читаем байты файла: для корректного UTF-8 нормализованные байты совпадают с кодировкой
+            # нормализованного текста, поэтому хешируем их без декодирования в строку и обратного кодирования
+            with open(abs_path, "rb") as f:
+                data = f.read()
+            try:
+                data.decode("utf-8")
+            except UnicodeDecodeError:
+                # Некорректные последовательности отбрасываются до нормализации окончаний строк (как при чтении в текстовом режиме)
+                content = data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+                return hashlib.md5(content.encode("utf-8")).hexdigest()
+            # Нормализуем окончания строк (как в LSPFileBuffer) и вычисляем хеш (как в LSPFileBuffer.content_hash)
+            return hashlib.md5(data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")).hexdigest()
         except Exception as e:
             log.debug(f"Failed to compute hash for {relative_file_path}: {e}")
             return ""
@@ -1027,27 +1330,31 @@ class BSLLanguageServer(SolidLanguageServer):
         except Exception:
             return ""
     
-    def _parse_file_local(self, relative_file_path: str) -> None:
+    def _parse_file_local(self, relative_file_path: str, source: str | None = None, parse_executor: Executor | None = None) -> None:
         """
         Парсит один файл локально и добавляет результаты в кеш.
         Проверяет существующий кеш pickle перед парсингом для избежания повторной обработки.
         Аналог обработки файла в addtocachefiles из vsc-language-1c-bsl.
         
         :param relative_file_path: Относительный путь к файлу
+        :param source: Содержимое файла, если оно уже есть в памяти (например, после редактирования);
+            если None, файл читается с диска
+        :param parse_executor: Пул процессов для парсинга; если None, файл парсится в текущем потоке
         """
         if self._local_cache is None:
             return
         
-        abs_path = os.path.join(self.repository_root_path, relative_file_path)
-        if not os.path.exists(abs_path):
+        abs_path = self._get_abs_path(relative_file_path)
+        if source is None and not self._file_exists(relative_file_path):
             log.debug(f"File not found: {abs_path}")
             return
         
         try:
             # Читаем файл и нормализуем окончания строк (как в LSPFileBuffer)
-            log.debug(f"Reading file: {relative_file_path}")
-            with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
-                source = f.read()
+            if source is None:
+                log.debug(f"Reading file: {relative_file_path}")
+                with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+                    source = f.read()
             
             # Нормализуем окончания строк (как в LSPFileBuffer)
             source = source.replace("\r\n", "\n").replace("\r", "\n")
@@ -1069,9 +1376,10 @@ class BSLLanguageServer(SolidLanguageServer):
             
             # Парсим файл
             log.debug(f"Parsing file: {relative_file_path} ({len(source)} chars)")
-            from solidlsp.bsl_parser import BSLParser
-            parser = BSLParser()
-            parse_result = parser.parse(source)
+            if parse_executor is not None:
+                parse_result = parse_executor.submit(_parse_bsl_source, source).result()
+            else:
+                parse_result = _parse_bsl_source(source)
             log.info(f"Parsed file: {relative_file_path} - {len(parse_result.methods)} methods, {len(parse_result.module_vars)} vars, {len(parse_result.global_calls)} global calls")
             
             # Извлекаем имя модуля
@@ -1152,15 +1460,16 @@ class BSLLanguageServer(SolidLanguageServer):
         # Таймаут для обработки одного файла (30 секунд на файл)
         file_timeout = 30.0
         
-        with ThreadPoolExecutor(max_workers=self.file_read_parallelism) as executor:
+        # Парсинг в пуле процессов (если задан parse_processes); потоки чтения файлов передают ему тексты модулей
+        parse_executor_context = ProcessPoolExecutor(max_workers=self.parse_processes) if self.parse_processes > 1 else contextlib.nullcontext()
+        with parse_executor_context as parse_executor, ThreadPoolExecutor(max_workers=self.file_read_parallelism) as executor:
             futures = {}
             for file_path in file_paths:
-                future = executor.submit(self._parse_file_local, file_path)
+                future = executor.submit(self._parse_file_local, file_path, None, parse_executor)
                 futures[future] = file_path
             
             last_logged_percent = -1
             last_logged_file = ""
-            processed_files = set()  # Отслеживаем обработанные файлы для обнаружения зацикливания
             
             # Используем таймаут для всего цикла as_completed, чтобы не зависнуть
             import threading
@@ -1169,26 +1478,49 @@ class BSLLanguageServer(SolidLanguageServer):
             def check_stuck():
                 """Проверяет, не застрял ли процесс на одном файле"""
                 last_count = completed_count
-                time.sleep(60)  # Ждем 60 секунд
-                if not stop_event.is_set() and completed_count == last_count:
+                # Ждем 60 секунд или завершения индексации (поток не остается спать после окончания цикла)
+                if stop_event.wait(timeout=60):
+                    return
+                if completed_count == last_count:
                     log.warning(
                         f"Possible stuck: no progress in 60 seconds. "
                         f"Completed: {completed_count}/{total_files}, "
-                        f"Active futures: {sum(1 for f in futures if not f.done())}"
+                        f"Active futures: {len(futures) - completed_count}"
                     )
             
             stuck_checker = threading.Thread(target=check_stuck, daemon=True)
             stuck_checker.start()
             
+            # Периодическое сохранение кеша выполняется в фоновом потоке, чтобы не блокировать цикл индексации:
+            # цикл только выставляет флаг, а поток сохраняет кеш не чаще одного раза в save_interval секунд
+            save_needed = threading.Event()
+            save_interval = 5.0
+            
+            def flush_periodically():
+                """Сохраняет кеш в фоне, пока идет индексация"""
+                while not stop_event.wait(timeout=save_interval):
+                    if save_needed.is_set():
+                        save_needed.clear()
+                        try:
+                            save_cache_callback()
+                            log.debug(f"Cache saved in background after processing {completed_count} files")
+                        except Exception as e:
+                            log.warning(f"Failed to save cache: {e}")
+            
+            cache_saver: threading.Thread | None = None
+            if save_cache_callback:
+                cache_saver = threading.Thread(target=flush_periodically, name="BSLCacheSaver", daemon=True)
+                cache_saver.start()
+            
+            all_completed = False
             try:
                 for future in as_completed(futures):
                     file_path = futures[future]
                     
                     # Проверяем, не обрабатывали ли мы уже этот файл (защита от зацикливания)
-                    if file_path in processed_files:
+                    if file_path in results:
                         log.warning(f"File {file_path} was already processed, skipping duplicate")
                         continue
-                    processed_files.add(file_path)
                     
                     try:
                         # Логируем текущий обрабатываемый файл
@@ -1232,28 +1564,25 @@ class BSLLanguageServer(SolidLanguageServer):
                             )
                             last_logged_percent = percent
                         
-                        # Сохраняем кеш периодически (каждые 200 файлов)
+                        # Помечаем кеш как требующий сохранения (сохраняет фоновый поток)
                         # Файлы уже добавлены в кеш инкрементально в _parse_file_local
-                        if save_cache_callback and completed_count % 200 == 0:
-                            try:
-                                save_cache_callback()
-                                log.debug(f"Cache saved after processing {completed_count} files")
-                            except Exception as e:
-                                log.warning(f"Failed to save cache: {e}")
+                        save_needed.set()
                     
                     except Exception as e:
                         log.error(f"Unexpected error processing {file_path}: {e}", exc_info=True)
                         results[file_path] = e
                         completed_count += 1
+                all_completed = True
             finally:
                 stop_event.set()
+                if cache_saver is not None:
+                    cache_saver.join()
                 
-                # Проверяем, все ли задачи завершены
-                pending = [f for f in futures if not f.done()]
-                if pending:
-                    log.warning(f"Some tasks did not complete: {len(pending)} pending futures")
-                    for future in pending:
-                        file_path = futures[future]
+                # Если цикл прерван досрочно, отменяем еще не начатые задачи вместо ожидания их выполнения
+                if not all_completed:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    log.warning(f"Some tasks did not complete: {completed_count}/{total_files} files processed")
+                    for file_path in file_paths:
                         if file_path not in results:
                             log.warning(f"Marking {file_path} as failed (task did not complete)")
                             results[file_path] = Exception("Task did not complete")
@@ -1298,34 +1627,33 @@ class BSLLanguageServer(SolidLanguageServer):
         from solidlsp import ls_types
         import hashlib
         
-        # Группируем методы по файлам
-        methods_by_file: dict[str, list] = defaultdict(list)
-        for method_info in self._local_cache.methods:
-            filename = method_info.filename
-            # Если only_new_files=True, пропускаем уже преобразованные файлы
-            if only_new_files and filename in self._converted_files:
-                continue
-            methods_by_file[filename].append(method_info)
+        # Определяем файлы для преобразования по индексу методов по файлам
+        # Если only_new_files=True, пропускаем уже преобразованные файлы
+        files_to_convert = [
+            filename
+            for filename in self._local_cache.get_method_files()
+            if not (only_new_files and filename in self._converted_files)
+        ]
         
-        if not methods_by_file:
+        if not files_to_convert:
             log.debug("No new files to convert to DocumentSymbols")
             return
         
-        log.debug(f"Converting {len(methods_by_file)} files to DocumentSymbols format (incremental: {only_new_files})")
+        log.debug(f"Converting {len(files_to_convert)} files to DocumentSymbols format (incremental: {only_new_files})")
         conversion_start = time.time()
         
         # Преобразуем методы каждого файла в DocumentSymbols
-        for filename, method_infos in methods_by_file.items():
+        for filename in files_to_convert:
             try:
                 # Вычисляем абсолютный путь один раз
-                abs_path = os.path.join(self.repository_root_path, filename)
+                abs_path = self._get_abs_path(filename)
                 
                 # Используем кешированное содержимое файла для избежания повторного чтения
                 if self._file_content_cache and filename in self._file_content_cache:
                     file_content = self._file_content_cache[filename]
                 else:
                     # Если нет в кеше, читаем файл
-                    if not os.path.exists(abs_path):
+                    if not self._file_exists(filename):
                         continue
                     with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
                         file_content = f.read()
@@ -1339,28 +1667,30 @@ class BSLLanguageServer(SolidLanguageServer):
                 # Создаем UnifiedSymbolInformation для каждого метода
                 unified_symbols: list[ls_types.UnifiedSymbolInformation] = []
                 
-                # Кэшируем разбиение на строки для всех методов файла
-                lines = file_content.split('\n')
+                # Смещения начала строк для всех методов файла (без разбиения содержимого на строки)
+                line_offsets = self._compute_line_offsets(file_content)
+                num_lines = len(line_offsets)
                 
-                for method_info in method_infos:
-                    method = method_info.method
+                # Методы файла берем по индексу методов по файлам
+                for method in self._local_cache.get_file_methods(filename):
+                    name = method.name
                     
                     # Определяем kind: 12 для Function, 6 для Method (процедура)
                     kind = 12 if not method.isproc else 6
                     
                     # Создаем range для метода
                     start_line = method.line
-                    end_line = min(method.endline, len(lines) - 1) if method.endline < len(lines) else len(lines) - 1
+                    end_line = min(method.endline, num_lines - 1)
                     
                     start_char = 0
-                    if start_line < len(lines):
+                    if start_line < num_lines:
                         # Находим позицию имени метода в строке
-                        method_line = lines[start_line]
-                        name_pos = method_line.find(method.name)
+                        line_start = line_offsets[start_line]
+                        name_pos = file_content.find(name, line_start, self._line_end_offset(file_content, line_offsets, start_line))
                         if name_pos != -1:
-                            start_char = name_pos
+                            start_char = name_pos - line_start
                     
-                    end_char = len(lines[end_line]) if end_line < len(lines) else 0
+                    end_char = self._line_end_offset(file_content, line_offsets, end_line) - line_offsets[end_line]
                     
                     range_obj = ls_types.Range(
                         start=ls_types.Position(line=start_line, character=start_char),
@@ -1368,7 +1698,7 @@ class BSLLanguageServer(SolidLanguageServer):
                     )
                     
                     # Создаем location
-                    uri = pathlib.Path(abs_path).as_uri()
+                    uri = self._get_file_uri(filename)
                     location = ls_types.Location(
                         uri=uri,
                         range=range_obj,
@@ -1377,25 +1707,20 @@ class BSLLanguageServer(SolidLanguageServer):
                     )
                     
                     # Формируем детали символа
-                    detail_parts = []
-                    if method.context:
-                        detail_parts.append(method.context)
-                    if method.is_export:
-                        detail_parts.append("Экспорт")
-                    detail = " | ".join(detail_parts) if detail_parts else None
+                    detail = self._format_method_detail(method.context, method.is_export)
                     
-                    # Создаем UnifiedSymbolInformation
-                    symbol: ls_types.UnifiedSymbolInformation = {
-                        "name": method.name,
-                        "kind": kind,
-                        "location": location,
-                        "range": range_obj,
-                        "selectionRange": range_obj,
-                        "children": [],
-                        "body": self._extract_method_body(file_content, method),
-                        "detail": detail,
-                        "description": method.description or None
-                    }
+                    # Создаем UnifiedSymbolInformation (тело метода загружается лениво, см. BSLMethodSymbol)
+                    symbol: ls_types.UnifiedSymbolInformation = BSLMethodSymbol(  # type: ignore
+                        name=name,
+                        kind=kind,
+                        location=location,
+                        range=range_obj,
+                        selectionRange=range_obj,
+                        # Отдельный список для каждого символа: базовый класс дополняет children при построении дерева
+                        children=[],
+                        detail=detail,
+                        description=method.description or None,
+                    )
                     
                     unified_symbols.append(symbol)
                 
@@ -1414,7 +1739,7 @@ class BSLLanguageServer(SolidLanguageServer):
                 log.error(f"Failed to convert local cache to DocumentSymbols for {filename}: {e}", exc_info=True)
         
         conversion_elapsed = time.time() - conversion_start
-        log.debug(f"Converted {len(methods_by_file)} files to DocumentSymbols in {conversion_elapsed:.2f}s")
+        log.debug(f"Converted {len(files_to_convert)} files to DocumentSymbols in {conversion_elapsed:.2f}s")
     
     def _convert_single_file_to_document_symbols(
         self,
@@ -1454,29 +1779,30 @@ class BSLLanguageServer(SolidLanguageServer):
         
         # Создаем UnifiedSymbolInformation для каждого метода
         unified_symbols: list[ls_types.UnifiedSymbolInformation] = []
-        lines = file_content.split('\n')
+        line_offsets = self._compute_line_offsets(file_content)
+        num_lines = len(line_offsets)
         
         for method in methods:
             kind = 12 if not method.isproc else 6
             
             start_line = method.line
-            end_line = min(method.endline, len(lines) - 1) if method.endline < len(lines) else len(lines) - 1
+            end_line = min(method.endline, num_lines - 1)
             
             start_char = 0
-            if start_line < len(lines):
-                method_line = lines[start_line]
-                name_pos = method_line.find(method.name)
+            if start_line < num_lines:
+                line_start = line_offsets[start_line]
+                name_pos = file_content.find(method.name, line_start, self._line_end_offset(file_content, line_offsets, start_line))
                 if name_pos != -1:
-                    start_char = name_pos
+                    start_char = name_pos - line_start
             
-            end_char = len(lines[end_line]) if end_line < len(lines) else 0
+            end_char = self._line_end_offset(file_content, line_offsets, end_line) - line_offsets[end_line]
             
             range_obj = ls_types.Range(
                 start=ls_types.Position(line=start_line, character=start_char),
                 end=ls_types.Position(line=end_line, character=end_char)
             )
             
-            uri = pathlib.Path(abs_path).as_uri()
+            uri = self._get_file_uri(relative_file_path)
             location = ls_types.Location(
                 uri=uri,
                 range=range_obj,
@@ -1484,24 +1810,20 @@ class BSLLanguageServer(SolidLanguageServer):
                 relativePath=relative_file_path
             )
             
-            detail_parts = []
-            if method.context:
-                detail_parts.append(method.context)
-            if method.is_export:
-                detail_parts.append("Экспорт")
-            detail = " | ".join(detail_parts) if detail_parts else None
-            
-            symbol: ls_types.UnifiedSymbolInformation = {
-                "name": method.name,
-                "kind": kind,
-                "location": location,
-                "range": range_obj,
-                "selectionRange": range_obj,
-                "children": [],
-                "body": self._extract_method_body(file_content, method),
-                "detail": detail,
-                "description": method.description or None
-            }
+            detail = self._format_method_detail(method.context, method.is_export)
+            
+            # Тело метода загружается лениво, см. BSLMethodSymbol
+            symbol: ls_types.UnifiedSymbolInformation = BSLMethodSymbol(  # type: ignore
+                name=method.name,
+                kind=kind,
+                location=location,
+                range=range_obj,
+                selectionRange=range_obj,
+                # Отдельный список для каждого символа: базовый класс дополняет children при построении дерева
+                children=[],
+                detail=detail,
+                description=method.description or None,
+            )
             
             unified_symbols.append(symbol)
         
@@ -1512,22 +1834,63 @@ class BSLLanguageServer(SolidLanguageServer):
             # Кладем None в raw cache: файл обработан локальным парсером, а не LSP
             self._raw_document_symbols_cache[raw_cache_key] = (file_hash, None)
     
-    def _extract_method_body(self, file_content: str, method: Any) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _format_method_detail(context: str, is_export: bool) -> str | None:
+        """
+        Формирует поле detail символа метода без создания промежуточного списка.
+        Набор значений мал (контекст компиляции и признак экспорта), поэтому результат запоминается:
+        символы всех методов ссылаются на одни и те же строки, что уменьшает кеш в памяти и при сохранении.
+
+        :param context: Контекст метода (НаСервере, НаКлиенте и т.д.) или пустая строка
+        :param is_export: Является ли метод экспортным
+        :return: Строка деталей или None
+        """
+        if context:
+            return f"{context} | Экспорт" if is_export else context
+        return "Экспорт" if is_export else None
+
+    @staticmethod
+    def _compute_line_offsets(file_content: str) -> list[int]:
+        """
+        Вычисляет смещения начала каждой строки в содержимом файла (без разбиения содержимого на строки).
+        
+        :param file_content: Содержимое файла
+        :return: Список смещений: line_offsets[i] - позиция первого символа строки i
+        """
+        return [0, *(match.end() for match in _NEWLINE_PATTERN.finditer(file_content))]
+    
+    @staticmethod
+    def _line_end_offset(file_content: str | bytes, line_offsets: list[int], line: int) -> int:
+        """
+        Возвращает смещение конца строки (позиция символа перевода строки или конец содержимого).
+        
+        :param file_content: Содержимое файла (текст или байты, смещения строк - в тех же единицах)
+        :param line_offsets: Смещения начала строк (см. _compute_line_offsets)
+        :param line: Номер строки (0-based), меньше len(line_offsets)
+        :return: Смещение конца строки
+        """
+        return line_offsets[line + 1] - 1 if line + 1 < len(line_offsets) else len(file_content)
+    
+    @staticmethod
+    def _extract_method_body(file_content: str, line_offsets: list[int], start_line: int, endline: int) -> str:
         """
-        Извлекает тело метода из содержимого файла.
+        Извлекает тело метода из содержимого файла одним срезом по таблице смещений строк
+        (без разбиения всего файла на строки).
         
         :param file_content: Содержимое файла
-        :param method: Метод для извлечения (BSLMethod)
+        :param line_offsets: Смещения начала строк (см. _compute_line_offsets)
+        :param start_line: Номер строки начала метода (0-based)
+        :param endline: Номер строки конца метода (0-based)
         :return: Тело метода
         """
-        lines = file_content.split('\n')
-        start_line = method.line
-        end_line = min(method.endline, len(lines) - 1) if method.endline < len(lines) else len(lines) - 1
+        num_lines = len(line_offsets)
+        end_line = min(endline, num_lines - 1)
         
-        if start_line > end_line or start_line >= len(lines):
+        if start_line > end_line or start_line >= num_lines:
             return ""
         
-        return '\n'.join(lines[start_line:end_line + 1])
+        return file_content[line_offsets[start_line]:BSLLanguageServer._line_end_offset(file_content, line_offsets, end_line)]
     
     def request_references(self, relative_file_path: str, line: int, column: int) -> list[ls_types.Location]:
         """
@@ -1553,8 +1916,8 @@ class BSLLanguageServer(SolidLanguageServer):
         """
         from solidlsp import ls_types
         
-        # Определяем имя символа по позиции
-        symbol_name = self._get_symbol_name_at_position(relative_file_path, line, column)
+        # Определяем имя и диапазон символа по позиции (один проход по символам документа)
+        symbol_name, symbol_range = self._find_symbol_at(relative_file_path, line, column)
         if not symbol_name:
             log.debug(f"Could not determine symbol name at {relative_file_path}:{line}:{column}, returning empty references")
             return []
@@ -1570,28 +1933,17 @@ class BSLLanguageServer(SolidLanguageServer):
         
         # Определяем определение символа, чтобы исключить его из результатов (если нужно)
         symbol_definition: dict[str, Any] | None = None
-        try:
-            document_symbols = self.request_document_symbols(relative_file_path)
-            for symbol in document_symbols.iter_symbols():
-                if symbol.get("name") == symbol_name:
-                    symbol_range = symbol.get("range")
-                    if symbol_range:
-                        symbol_start_line = symbol_range["start"]["line"]
-                        symbol_start_char = symbol_range["start"]["character"]
-                        # Проверяем, находится ли позиция в определении символа
-                        if (symbol_start_line == line and 
-                            symbol_start_char <= column <= symbol_range["end"]["character"]):
-                            symbol_definition = {
-                                "filename": relative_file_path,
-                                "line": symbol_start_line,
-                                "character": symbol_start_char
-                            }
-                            break
-        except Exception as e:
-            log.debug(f"Could not determine symbol definition: {e}")
+        if self._is_definition_position(symbol_range, line, column):
+            symbol_definition = {
+                "filename": relative_file_path,
+                "line": symbol_range["start"]["line"],
+                "character": symbol_range["start"]["character"]
+            }
         
         # Преобразуем вызовы в формат Location
         references: list[ls_types.Location] = []
+        # Строки уже прочитанных файлов: файл с несколькими вызовами читается один раз
+        lines_cache: dict[str, tuple[str | bytes, list[int]]] = {}
         
         for call_info in call_infos:
             try:
@@ -1608,22 +1960,20 @@ class BSLLanguageServer(SolidLanguageServer):
                     log.debug(f"Skipping symbol definition at {call_info.filename}:{call_info.line}:{call_info.character}")
                     continue
                 
-                # Проверяем существование файла
-                abs_path = os.path.join(self.repository_root_path, call_info.filename)
-                if not os.path.exists(abs_path):
+                # Читаем только строку вызова для определения точной позиции
+                # (без отдельной проверки существования файла: отсутствие файла обнаруживается при чтении)
+                abs_path = self._get_abs_path(call_info.filename)
+                try:
+                    call_line = self._read_file_line(call_info.filename, call_info.line, lines_cache)
+                except FileNotFoundError:
+                    self._known_files.discard(call_info.filename)
                     log.debug(f"File not found: {abs_path}, skipping reference")
                     continue
-                
-                # Читаем файл для определения точной позиции вызова
-                with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
-                    file_lines = f.read().split('\n')
-                
-                if call_info.line >= len(file_lines):
+                if call_line is None:
                     log.debug(f"Line {call_info.line} out of range for {call_info.filename}, skipping")
                     continue
                 
                 # Находим точную позицию вызова в строке
-                call_line = file_lines[call_info.line]
                 call_char = call_info.character
                 
                 # Убеждаемся, что позиция не выходит за границы строки
@@ -1632,7 +1982,7 @@ class BSLLanguageServer(SolidLanguageServer):
                 
                 # Ищем имя символа в строке для более точной позиции
                 # Ищем первое вхождение имени символа после указанной позиции
-                name_pos = call_line.find(symbol_name, call_char)
+                name_pos = self._find_name_in_line(call_line, symbol_name, call_char)
                 if name_pos == -1:
                     # Если не нашли, используем исходную позицию
                     name_pos = call_char
@@ -1649,7 +1999,7 @@ class BSLLanguageServer(SolidLanguageServer):
                 )
                 
                 # Создаем Location
-                uri = pathlib.Path(abs_path).as_uri()
+                uri = self._get_file_uri(call_info.filename)
                 location = ls_types.Location(
                     uri=uri,
                     range=range_obj,
@@ -1666,14 +2016,45 @@ class BSLLanguageServer(SolidLanguageServer):
         log.info(f"Found {len(references)} references to '{symbol_name}' via local cache")
         return references
     
-    def _get_symbol_name_at_position(self, relative_file_path: str, line: int, column: int) -> str | None:
+    @staticmethod
+    def _find_name_in_line(line_text: str, name: str, column: int) -> int:
+        """
+        Находит позицию имени в строке начиная с колонки. Обычно имя начинается ровно в указанной колонке,
+        поэтому сначала проверяется она, и только затем выполняется поиск по остатку строки.
+        
+        :param line_text: Текст строки
+        :param name: Искомое имя
+        :param column: Колонка, с которой начинается поиск (0-based)
+        :return: Позиция имени в строке или -1, если имя не найдено
+        """
+        if line_text.startswith(name, column):
+            return column
+        return line_text.find(name, column)
+    
+    @staticmethod
+    def _is_definition_position(symbol_range: dict[str, Any] | None, line: int, column: int) -> bool:
         """
-        Определяет имя символа по позиции в файле.
+        Проверяет, указывает ли позиция на строку определения символа.
+        
+        :param symbol_range: Диапазон символа (или None)
+        :param line: Номер строки (0-based)
+        :param column: Номер колонки (0-based)
+        :return: True, если позиция находится в определении символа
+        """
+        if not symbol_range:
+            return False
+        return (symbol_range["start"]["line"] == line and
+                symbol_range["start"]["character"] <= column <= symbol_range["end"]["character"])
+    
+    def _find_symbol_at(self, relative_file_path: str, line: int, column: int) -> tuple[str | None, dict[str, Any] | None]:
+        """
+        Определяет имя и диапазон символа по позиции в файле за один проход по символам документа.
         
         :param relative_file_path: Относительный путь к файлу
         :param line: Номер строки (0-based)
         :param column: Номер колонки (0-based)
-        :return: Имя символа или None, если не удалось определить
+        :return: Кортеж (имя символа, диапазон символа); диапазон равен None, если имя определено
+            по тексту файла, имя равно None, если его не удалось определить
         """
         try:
             # Получаем символы из кеша
@@ -1697,17 +2078,14 @@ class BSLLanguageServer(SolidLanguageServer):
                     if line == end_line and column > end_char:
                         continue
                     
-                    # Нашли символ, возвращаем его имя
-                    return symbol.get("name")
+                    # Нашли символ, возвращаем его имя и диапазон
+                    return symbol.get("name"), symbol_range
             
             # Если не нашли символ в кеше, пытаемся определить по тексту файла
-            abs_path = os.path.join(self.repository_root_path, relative_file_path)
-            if os.path.exists(abs_path):
-                with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
-                    file_lines = f.read().split('\n')
+            if self._file_exists(relative_file_path):
+                file_line = self._read_file_line(relative_file_path, line)
                 
-                if line < len(file_lines):
-                    file_line = file_lines[line]
+                if file_line is not None:
                     # Пытаемся извлечь имя символа из позиции
                     # Для BSL ищем идентификатор (начинается с буквы, содержит буквы, цифры и подчеркивания)
                     if column < len(file_line):
@@ -1725,13 +2103,13 @@ class BSLLanguageServer(SolidLanguageServer):
                             symbol_name = file_line[start:end]
                             # Проверяем, что это валидный идентификатор (начинается с буквы)
                             if symbol_name and (symbol_name[0].isalpha() or symbol_name[0] in 'АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯабвгдеёжзийклмнопрстуфхцчшщъыьэюя'):
-                                return symbol_name
+                                return symbol_name, None
             
-            return None
+            return None, None
             
         except Exception as e:
             log.debug(f"Failed to get symbol name at position {relative_file_path}:{line}:{column}: {e}")
-            return None
+            return None, None
     
     def insert_text_at_position(self, relative_file_path: str, line: int, column: int, text_to_be_inserted: str) -> ls_types.Position:
         """
@@ -1744,20 +2122,18 @@ class BSLLanguageServer(SolidLanguageServer):
         :param text_to_be_inserted: The text to insert.
         :return: The updated cursor position after inserting the text.
         """
-        # Читаем файл напрямую
-        absolute_file_path = os.path.join(self.repository_root_path, relative_file_path)
-        with open(absolute_file_path, 'r', encoding=self.encoding) as f:
-            file_content = f.read()
+        # Читаем текущее содержимое файла
+        absolute_file_path = self._get_abs_path(relative_file_path)
+        file_content, _ = self._read_file_content(relative_file_path)
         
         # Используем TextUtils для редактирования
         new_contents, new_l, new_c = TextUtils.insert_text_at_position(file_content, line, column, text_to_be_inserted)
         
         # Записываем файл обратно
-        with open(absolute_file_path, 'w', encoding=self.encoding) as f:
-            f.write(new_contents)
+        self._write_file_atomic(absolute_file_path, new_contents, self._encoding)
         
-        # Обновляем кеш для измененного файла
-        self._invalidate_file_cache(relative_file_path)
+        # Обновляем кеш для измененного файла (без повторного чтения с диска)
+        self._invalidate_file_cache(relative_file_path, new_contents)
         
         return ls_types.Position(line=new_l, character=new_c)
     
@@ -1776,10 +2152,9 @@ class BSLLanguageServer(SolidLanguageServer):
         :param end: The end position.
         :return: The deleted text.
         """
-        # Читаем файл напрямую
-        absolute_file_path = os.path.join(self.repository_root_path, relative_file_path)
-        with open(absolute_file_path, 'r', encoding=self.encoding) as f:
-            file_content = f.read()
+        # Читаем текущее содержимое файла
+        absolute_file_path = self._get_abs_path(relative_file_path)
+        file_content, _ = self._read_file_content(relative_file_path)
         
         # Используем TextUtils для редактирования
         new_contents, deleted_text = TextUtils.delete_text_between_positions(
@@ -1787,11 +2162,10 @@ class BSLLanguageServer(SolidLanguageServer):
         )
         
         # Записываем файл обратно
-        with open(absolute_file_path, 'w', encoding=self.encoding) as f:
-            f.write(new_contents)
+        self._write_file_atomic(absolute_file_path, new_contents, self._encoding)
         
-        # Обновляем кеш для измененного файла
-        self._invalidate_file_cache(relative_file_path)
+        # Обновляем кеш для измененного файла (без повторного чтения с диска)
+        self._invalidate_file_cache(relative_file_path, new_contents)
         
         return deleted_text
     
@@ -1813,158 +2187,48 @@ class BSLLanguageServer(SolidLanguageServer):
         :return: A WorkspaceEdit containing the changes needed to rename the symbol, or None if rename is not supported
         """
         from solidlsp import ls_types
-        import pathlib
         
-        # Определяем имя символа по позиции
-        symbol_name = self._get_symbol_name_at_position(relative_file_path, line, column)
+        # Определяем имя и диапазон символа по позиции (один проход по символам документа)
+        symbol_name, symbol_range = self._find_symbol_at(relative_file_path, line, column)
         if not symbol_name:
             log.debug(f"Could not determine symbol name at {relative_file_path}:{line}:{column}")
             return None
         
+        # Имя не меняется - редактировать нечего, файлы не читаем
+        if symbol_name == new_name:
+            return {"changes": {}}
+        
         log.debug(f"Renaming symbol '{symbol_name}' to '{new_name}' via local cache")
         
         # Находим все вызовы этого символа в кеше
         call_infos = self._local_cache.find_calls(symbol_name)
         
-        # Получаем определение символа через request_document_symbols
-        document_symbols = self.request_document_symbols(relative_file_path)
-        symbol_definition: dict[str, Any] | None = None
-        for symbol in document_symbols.iter_symbols():
-            if symbol.get("name") == symbol_name:
-                symbol_range = symbol.get("range")
-                if symbol_range:
-                    symbol_start_line = symbol_range["start"]["line"]
-                    symbol_start_char = symbol_range["start"]["character"]
-                    # Проверяем, находится ли позиция в определении символа
-                    if (symbol_start_line == line and 
-                        symbol_start_char <= column <= symbol_range["end"]["character"]):
-                        symbol_definition = {
-                            "filename": relative_file_path,
-                            "range": symbol_range
-                        }
-                        break
-        
-        # Создаем список TextEdit для всех мест использования
-        text_edits: list[ls_types.TextEdit] = []
-        
-        # Добавляем редактирование для определения символа
-        if symbol_definition:
-            def_range = symbol_definition["range"]
-            # Читаем файл для определения точной позиции имени символа в строке
-            abs_path = os.path.join(self.repository_root_path, relative_file_path)
-            with open(abs_path, 'r', encoding=self.encoding) as f:
-                file_lines = f.read().split('\n')
-            
-            if def_range["start"]["line"] < len(file_lines):
-                def_line = file_lines[def_range["start"]["line"]]
-                # Ищем начало и конец имени символа в строке
-                start_char = def_line.find(symbol_name, def_range["start"]["character"])
-                if start_char != -1:
-                    end_char = start_char + len(symbol_name)
-                    text_edits.append({
-                        "range": {
-                            "start": {"line": def_range["start"]["line"], "character": start_char},
-                            "end": {"line": def_range["start"]["line"], "character": end_char}
-                        },
-                        "newText": new_name
-                    })
-        
-        # Добавляем редактирования для всех вызовов
+        # Группируем места редактирования по файлам (строка, колонка начала поиска имени),
+        # чтобы каждый файл читался с диска только один раз.
+        # Определение символа - найденный символ, если позиция указывает на его начало
+        positions_by_file: dict[str, list[tuple[int, int]]] = {}
+        if self._is_definition_position(symbol_range, line, column):
+            def_start = symbol_range["start"]
+            positions_by_file[relative_file_path] = [(def_start["line"], def_start["character"])]
         for call_info in call_infos:
-            call_file_path = call_info.filename
-            call_abs_path = os.path.join(self.repository_root_path, call_file_path)
-            
-            if not os.path.exists(call_abs_path):
-                continue
-            
-            # Читаем файл для определения точной позиции имени символа в строке
-            with open(call_abs_path, 'r', encoding=self.encoding) as f:
-                call_file_lines = f.read().split('\n')
-            
-            if call_info.line < len(call_file_lines):
-                call_line = call_file_lines[call_info.line]
-                # Ищем начало и конец имени символа в строке
-                start_char = call_line.find(symbol_name, call_info.character)
-                if start_char != -1:
-                    end_char = start_char + len(symbol_name)
-                    # Создаем URI для файла
-                    call_uri = pathlib.Path(call_abs_path).as_uri()
-                    
-                    # Добавляем TextEdit (будет использован в changes)
-                    text_edits.append({
-                        "range": {
-                            "start": {"line": call_info.line, "character": start_char},
-                            "end": {"line": call_info.line, "character": end_char}
-                        },
-                        "newText": new_name
-                    })
+            positions_by_file.setdefault(call_info.filename, []).append((call_info.line, call_info.character))
         
-        if not text_edits:
-            log.debug(f"No edits found for renaming symbol '{symbol_name}'")
-            return None
+        # Файлы обрабатываются независимо, поэтому чтение и поиск позиций в нескольких файлах выполняются параллельно
+        file_items = list(positions_by_file.items())
         
-        # Группируем редактирования по файлам для WorkspaceEdit
-        changes: dict[str, list[ls_types.TextEdit]] = {}
-        for edit in text_edits:
-            # Определяем файл для редактирования
-            # Для определения символа используем relative_file_path
-            # Для вызовов используем call_info.filename
-            # Но в text_edits нет информации о файле, нужно добавить её
-            # Используем другой подход - создаем changes напрямую
-            pass
-        
-        # Пересоздаем text_edits с группировкой по файлам
-        changes: dict[str, list[ls_types.TextEdit]] = {}
+        def build_file_edits(item: tuple[str, list[tuple[int, int]]]) -> list[ls_types.TextEdit]:
+            return self._build_rename_edits_for_file(item[0], item[1], symbol_name, new_name)
         
-        # Добавляем редактирование для определения символа
-        if symbol_definition:
-            def_uri = pathlib.Path(os.path.join(self.repository_root_path, relative_file_path)).as_uri()
-            def_range = symbol_definition["range"]
-            abs_path = os.path.join(self.repository_root_path, relative_file_path)
-            with open(abs_path, 'r', encoding=self.encoding) as f:
-                file_lines = f.read().split('\n')
-            
-            if def_range["start"]["line"] < len(file_lines):
-                def_line = file_lines[def_range["start"]["line"]]
-                start_char = def_line.find(symbol_name, def_range["start"]["character"])
-                if start_char != -1:
-                    end_char = start_char + len(symbol_name)
-                    if def_uri not in changes:
-                        changes[def_uri] = []
-                    changes[def_uri].append({
-                        "range": {
-                            "start": {"line": def_range["start"]["line"], "character": start_char},
-                            "end": {"line": def_range["start"]["line"], "character": end_char}
-                        },
-                        "newText": new_name
-                    })
+        if len(file_items) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.RENAME_MAX_WORKERS, len(file_items))) as executor:
+                edits_per_file = list(executor.map(build_file_edits, file_items))
+        else:
+            edits_per_file = [build_file_edits(item) for item in file_items]
         
-        # Добавляем редактирования для всех вызовов
-        for call_info in call_infos:
-            call_abs_path = os.path.join(self.repository_root_path, call_info.filename)
-            
-            if not os.path.exists(call_abs_path):
-                continue
-            
-            with open(call_abs_path, 'r', encoding=self.encoding) as f:
-                call_file_lines = f.read().split('\n')
-            
-            if call_info.line < len(call_file_lines):
-                call_line = call_file_lines[call_info.line]
-                start_char = call_line.find(symbol_name, call_info.character)
-                if start_char != -1:
-                    end_char = start_char + len(symbol_name)
-                    call_uri = pathlib.Path(call_abs_path).as_uri()
-                    
-                    if call_uri not in changes:
-                        changes[call_uri] = []
-                    changes[call_uri].append({
-                        "range": {
-                            "start": {"line": call_info.line, "character": start_char},
-                            "end": {"line": call_info.line, "character": end_char}
-                        },
-                        "newText": new_name
-                    })
+        changes: dict[str, list[ls_types.TextEdit]] = {}
+        for (file_path, _), file_edits in zip(file_items, edits_per_file):
+            if file_edits:
+                changes[self._get_file_uri(file_path)] = file_edits
         
         if not changes:
             log.debug(f"No edits found for renaming symbol '{symbol_name}'")
@@ -1978,6 +2242,48 @@ class BSLLanguageServer(SolidLanguageServer):
         log.debug(f"Created WorkspaceEdit with {len(changes)} files and {sum(len(edits) for edits in changes.values())} edits")
         return workspace_edit
     
+    def _build_rename_edits_for_file(
+        self, relative_file_path: str, positions: list[tuple[int, int]], symbol_name: str, new_name: str
+    ) -> list[ls_types.TextEdit]:
+        """
+        Строит правки переименования для одного файла.
+        
+        :param relative_file_path: Относительный путь к файлу
+        :param positions: Позиции (строка, колонка начала поиска имени) для правок в этом файле
+        :param symbol_name: Текущее имя символа
+        :param new_name: Новое имя символа
+        :return: Список TextEdit для файла (пустой, если файл не найден или имя не найдено в строках)
+        """
+        # Получаем содержимое файла для определения точной позиции имени символа в строках
+        # (без отдельной проверки существования файла: отсутствие файла обнаруживается при чтении)
+        try:
+            file_content, line_offsets = self._read_file_content(relative_file_path)
+        except FileNotFoundError:
+            self._known_files.discard(relative_file_path)
+            return []
+        
+        file_edits: list[ls_types.TextEdit] = []
+        # Позиции уже добавленных правок: определение и вызов могут указывать на одно и то же вхождение имени
+        edited_positions: set[tuple[int, int]] = set()
+        for edit_line, search_start in positions:
+            if edit_line >= len(line_offsets):
+                continue
+            # Ищем начало и конец имени символа в строке
+            file_line = self._extract_method_body(file_content, line_offsets, edit_line, edit_line)
+            start_char = self._find_name_in_line(file_line, symbol_name, search_start)
+            if start_char == -1 or (edit_line, start_char) in edited_positions:
+                continue
+            edited_positions.add((edit_line, start_char))
+            end_char = start_char + len(symbol_name)
+            file_edits.append({
+                "range": {
+                    "start": {"line": edit_line, "character": start_char},
+                    "end": {"line": edit_line, "character": end_char}
+                },
+                "newText": new_name
+            })
+        return file_edits
+    
     def apply_text_edits_to_file(self, relative_path: str, edits: list[ls_types.TextEdit]) -> None:
         """
         Apply a list of text edits to a file using direct file editing.
@@ -1986,43 +2292,84 @@ class BSLLanguageServer(SolidLanguageServer):
         :param relative_path: The relative path of the file to edit.
         :param edits: List of TextEdit dictionaries to apply.
         """
-        # Читаем файл напрямую
-        absolute_file_path = os.path.join(self.repository_root_path, relative_path)
-        with open(absolute_file_path, 'r', encoding=self.encoding) as f:
-            file_content = f.read()
+        # Нечего применять - не читаем и не перезаписываем файл
+        if not edits:
+            return
         
-        # Сортируем редактирования по позиции (с конца к началу, чтобы не сломать позиции)
-        sorted_edits = sorted(edits, key=lambda e: (e["range"]["start"]["line"], e["range"]["start"]["character"]), reverse=True)
+        # Читаем текущее содержимое файла и смещения начала строк
+        absolute_file_path = self._get_abs_path(relative_path)
+        file_content, line_offsets = self._read_file_content(relative_path)
         
-        # Применяем редактирования
-        for edit in sorted_edits:
-            start_pos = edit["range"]["start"]
-            end_pos = edit["range"]["end"]
-            
-            # Удаляем текст между позициями
-            file_content, _ = TextUtils.delete_text_between_positions(
-                file_content, start_line=start_pos["line"], start_col=start_pos["character"], 
-                end_line=end_pos["line"], end_col=end_pos["character"]
-            )
-            
-            # Вставляем новый текст
-            file_content, _, _ = TextUtils.insert_text_at_position(
-                file_content, start_pos["line"], start_pos["character"], edit["newText"]
-            )
+        # Переводим позиции редактирований в абсолютные смещения
+        
+        def to_offset(position: ls_types.Position) -> int:
+            if position["line"] >= len(line_offsets):
+                raise InvalidTextLocationError
+            return line_offsets[position["line"]] + position["character"]
+        
+        # Сортируем редактирования по позиции (сортировка стабильна, порядок вставок в одной позиции сохраняется)
+        sorted_edits = sorted(
+            ((to_offset(edit["range"]["start"]), to_offset(edit["range"]["end"]), edit["newText"]) for edit in edits),
+            key=itemgetter(0),
+        )
+        
+        # Если каждое редактирование заменяет текст на тот же самый, файл не перезаписываем
+        if all(file_content[start_offset:end_offset] == new_text for start_offset, end_offset, new_text in sorted_edits):
+            return
+        
+        # Собираем новое содержимое за один проход: неизменённые фрагменты чередуются с новым текстом
+        parts: list[str] = []
+        prev_end = 0
+        for start_offset, end_offset, new_text in sorted_edits:
+            parts.append(file_content[prev_end:start_offset])
+            parts.append(new_text)
+            prev_end = max(prev_end, end_offset)
+        parts.append(file_content[prev_end:])
+        file_content = ''.join(parts)
         
         # Записываем файл обратно
-        with open(absolute_file_path, 'w', encoding=self.encoding) as f:
-            f.write(file_content)
+        self._write_file_atomic(absolute_file_path, file_content, self._encoding)
         
-        # Обновляем кеш для измененного файла
-        self._invalidate_file_cache(relative_path)
+        # Обновляем кеш для измененного файла (без повторного чтения с диска)
+        self._invalidate_file_cache(relative_path, file_content)
     
-    def _invalidate_file_cache(self, relative_file_path: str) -> None:
+    @staticmethod
+    def _write_file_atomic(absolute_file_path: str, contents: str, encoding: str) -> None:
+        """
+        Записывает файл атомарно: содержимое пишется во временный файл в той же директории,
+        который затем заменяет исходный через os.replace. При сбое во время записи исходный файл не повреждается.
+
+        :param absolute_file_path: Абсолютный путь к файлу
+        :param contents: Новое содержимое файла
+        :param encoding: Кодировка файла
+        """
+        dir_path = os.path.dirname(absolute_file_path)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding=encoding, dir=dir_path, prefix=".serena-", suffix=".tmp", delete=False
+        ) as tmp_file:
+            tmp_path = tmp_file.name
+            try:
+                tmp_file.write(contents)
+            except BaseException:
+                tmp_file.close()
+                os.unlink(tmp_path)
+                raise
+        try:
+            if os.path.exists(absolute_file_path):
+                shutil.copymode(absolute_file_path, tmp_path)
+            os.replace(tmp_path, absolute_file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _invalidate_file_cache(self, relative_file_path: str, new_contents: str | None = None) -> None:
         """
         Инвалидирует кеш для конкретного файла и переиндексирует его.
         Используется после редактирования файла для точечного обновления кеша.
         
         :param relative_file_path: Относительный путь к файлу
+        :param new_contents: Новое содержимое файла, если оно уже известно (тогда файл не перечитывается с диска)
         """
         log.debug(f"Invalidating cache for file: {relative_file_path}")
         
@@ -2037,15 +2384,18 @@ class BSLLanguageServer(SolidLanguageServer):
         if self._local_cache is not None:
             self._local_cache.remove_file_data(relative_file_path)
         
-        # 3. Удаление из кеша содержимого файлов
+        # 3. Удаление из кешей содержимого файлов
         self._file_content_cache.pop(relative_file_path, None)
+        _read_body_source.cache_clear()
         
         # 4. Удаление из списка преобразованных файлов
         self._converted_files.discard(relative_file_path)
         
         # 5. Переиндексация файла
         # _parse_file_local уже вызывает _convert_single_file_to_document_symbols внутри
-        self._parse_file_local(relative_file_path)
+        self._parse_file_local(relative_file_path, source=new_contents)
+        if new_contents is not None:
+            self._file_content_cache[relative_file_path] = new_contents
         
         log.debug(f"Cache invalidated and file reindexed: {relative_file_path}")
     
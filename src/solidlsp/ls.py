@@ -109,13 +109,14 @@ class DocumentSymbols:
             yield from self._all_symbols
             return
 
-        def traverse(s: ls_types.UnifiedSymbolInformation) -> Iterator[ls_types.UnifiedSymbolInformation]:
+        # explicit stack instead of recursive generators (children are pushed in reverse to retain the pre-order)
+        stack = list(reversed(self.root_symbols))
+        while stack:
+            s = stack.pop()
             yield s
-            for child in s.get("children", []):
-                yield from traverse(child)
-
-        for root_symbol in self.root_symbols:
-            yield from traverse(root_symbol)
+            children = s.get("children")
+            if children:
+                stack.extend(reversed(children))
 
     def get_all_symbols_and_roots(self) -> tuple[list[ls_types.UnifiedSymbolInformation], list[ls_types.UnifiedSymbolInformation]]:
         """
@@ -1090,6 +1091,19 @@ class SolidLanguageServer(ABC):
 
             return document_symbols
 
+    def request_symbols_by_name(self, name: str, substring_matching: bool = False) -> list[ls_types.UnifiedSymbolInformation] | None:
+        """
+        Retrieves the symbols of the full symbol tree (see :meth:`request_full_symbol_tree`) whose name is equal to
+        (or, with substring matching, contains) the given name, using a symbol name index.
+        The symbols are returned in the order of a depth-first traversal of the symbol tree.
+
+        :param name: the symbol name to look up
+        :param substring_matching: whether to return symbols whose name contains the given name
+        :return: the matching symbols or None if the language server does not maintain a symbol name index,
+            in which case the full symbol tree needs to be traversed instead
+        """
+        return None
+
     def request_full_symbol_tree(self, within_relative_path: str | None = None) -> list[ls_types.UnifiedSymbolInformation]:
         """
         Will go through all files in the project or within a relative path and build a tree of symbols.
@@ -1,10 +1,42 @@
+import glob
 import logging
+import os
+import tempfile
+import time
 from typing import Any, Optional
 
 from sensai.util.pickle import dump_pickle, load_pickle
 
 log = logging.getLogger(__name__)
 
+# pinned (rather than pickle.HIGHEST_PROTOCOL) such that cache files remain loadable by all supported interpreters
+CACHE_PICKLE_PROTOCOL = 5
+
+# temporary files of saves that were interrupted (e.g. a killed process) are removed once they are older than this
+STALE_TEMP_FILE_AGE_SECONDS = 3600
+
+
+def _get_default_file_mode() -> int:
+    """
+    Determines the mode of regular files created under the process umask.
+    The umask is read from /proc/self/status (Linux) instead of being queried via os.umask, which would
+    temporarily change the umask of the whole process (affecting files created concurrently by other threads);
+    where it is unavailable, the common default mode 0o644 is used.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return 0o666 & ~int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    return 0o644
+
+
+# mode of newly created cache files (as for a regular open() under the process umask at import time);
+# temporary files created via mkstemp are owner-only, so the mode is applied explicitly
+_DEFAULT_CACHE_FILE_MODE = _get_default_file_mode()
+
 
 def load_cache(path: str, version: Any) -> Optional[Any]:
     data = load_pickle(path)
@@ -19,5 +51,45 @@ def load_cache(path: str, version: Any) -> Optional[Any]:
 
 
 def save_cache(path: str, version: Any, obj: Any) -> None:
+    """
+    Persists the given object together with its version.
+
+    The data is pickled into a temporary file in the target directory, which then atomically replaces
+    the cache file, such that concurrent loads (or an interrupted save) never observe a truncated cache.
+    """
     data = {"__cache_version": version, "obj": obj}
-    dump_pickle(data, path)
+    dir_name = os.path.dirname(path) or "."
+    os.makedirs(dir_name, exist_ok=True)
+    tmp_prefix = os.path.basename(path) + "."
+    _remove_stale_temp_files(dir_name, tmp_prefix)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_name, prefix=tmp_prefix, suffix=".tmp")
+    os.close(fd)
+    try:
+        dump_pickle(data, tmp_path, protocol=CACHE_PICKLE_PROTOCOL)
+        # keep the mode of an existing cache file, otherwise use the default mode for new files
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = _DEFAULT_CACHE_FILE_MODE
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _remove_stale_temp_files(dir_name: str, tmp_prefix: str) -> None:
+    """
+    Removes temporary files left behind by saves of the same cache file that were interrupted.
+    Recent temporary files are kept, since they may belong to a save that is still in progress.
+    """
+    threshold = time.time() - STALE_TEMP_FILE_AGE_SECONDS
+    for tmp_path in glob.glob(os.path.join(glob.escape(dir_name), glob.escape(tmp_prefix) + "*.tmp")):
+        try:
+            if os.path.getmtime(tmp_path) < threshold:
+                os.remove(tmp_path)
+        except OSError:
+            pass
@@ -1,6 +1,7 @@
 import json
 import logging
 import os
+import threading
 import time
 from collections.abc import Iterator
 
@@ -352,3 +353,57 @@ class TestSerenaAgent:
         replace_symbol_body_tool = serena_agent.get_tool(ReplaceSymbolBodyTool)
         with pytest.raises(ValueError, match=match_text):
             replace_symbol_body_tool.apply(name_path=name_path, relative_path=relative_path, body="")
+
+
+def test_wait_for_language_server_manager_without_pending_initialization(serena_config) -> None:
+    """Waiting for the language server manager must not block if no initialization is pending (also after a failed reset)."""
+    agent = SerenaAgent(serena_config=serena_config)
+    try:
+        start_time = time.time()
+        assert agent.wait_for_language_server_manager(timeout=30) is None
+
+        with pytest.raises(ValueError, match="No active project"):
+            agent.reset_language_server_manager()
+        assert agent.wait_for_language_server_manager(timeout=30) is None
+        assert time.time() - start_time < 10
+    finally:
+        agent.shutdown(timeout=5)
+
+
+def test_wait_for_language_server_manager_after_cancelled_initialization(serena_config) -> None:
+    """Waiting for the language server manager must not block if the initialization task is cancelled before it is executed."""
+    agent = SerenaAgent(serena_config=serena_config)
+    release_executor = threading.Event()
+    try:
+        # keep the executor busy, such that the initialization task remains queued
+        agent.issue_task(release_executor.wait, name="BlockExecutor")
+        agent.activate_project_from_path_or_name(f"test_repo_{Language.PYTHON}")
+        init_tasks = [task for task in agent.get_current_tasks() if task.name.endswith("init_language_server_manager")]
+        assert len(init_tasks) == 1
+        init_tasks[0].cancel()
+
+        start_time = time.time()
+        agent.wait_for_language_server_manager(timeout=30)
+        assert time.time() - start_time < 10
+    finally:
+        release_executor.set()
+        agent.shutdown(timeout=5)
+
+
+def test_wait_for_language_server_manager_after_failed_task_submission(serena_config, monkeypatch) -> None:
+    """Waiting for the language server manager must not block if the initialization task could not be issued."""
+    agent = SerenaAgent(serena_config=serena_config)
+    try:
+
+        def fail_to_issue_task(*args, **kwargs):
+            raise RuntimeError("executor unavailable")
+
+        monkeypatch.setattr(agent, "issue_task", fail_to_issue_task)
+        with pytest.raises(RuntimeError, match="executor unavailable"):
+            agent.activate_project_from_path_or_name(f"test_repo_{Language.PYTHON}")
+
+        start_time = time.time()
+        agent.wait_for_language_server_manager(timeout=30)
+        assert time.time() - start_time < 10
+    finally:
+        agent.shutdown(timeout=5)
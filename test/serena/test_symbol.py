@@ -176,3 +176,15 @@ class TestSymbolNameMatching:
         result = matcher.matches_components(symbol_name_path_parts, symbol_overload_idx)
         error_msg = self._create_assertion_error_message(name_path_pattern, symbol_name_path_parts, False, expected, result)
         assert result == expected, error_msg
+
+    @pytest.mark.parametrize(
+        "name_path_pattern, expected",
+        [
+            pytest.param("foo", "foo", id="simple name"),
+            pytest.param("/bar/foo", "foo", id="absolute name path"),
+            pytest.param("bar/foo[1]", "foo", id="name path with overload index"),
+        ],
+    )
+    def test_name_pattern(self, name_path_pattern, expected):
+        """Tests that the name pattern is the last segment of the name path pattern without overload index."""
+        assert NamePathMatcher(name_path_pattern, False).name_pattern == expected
@@ -0,0 +1,58 @@
+"""
+Общие фикстуры для тестов BSL на реальных проектах 1С.
+"""
+
+import os
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from serena.agent import SerenaAgent
+
+# Возможные пути к проектам 1С (Windows и Docker)
+_BSL_PROJECT_PATH_CANDIDATES: dict[str, tuple[Path, ...]] = {
+    "BASE": (Path(r"D:\1C\BASE"), Path("/workspaces/serena/1C/BASE")),
+    "RZDZUP": (Path(r"D:\1C\RZDZUP"), Path("/workspaces/serena/1C/RZDZUP")),
+}
+
+# Существующий путь каждого проекта определяется один раз при импорте (None, если проект не найден)
+_BSL_PROJECT_PATHS: dict[str, Path | None] = {
+    name: next((path for path in candidates if path.exists()), None) for name, candidates in _BSL_PROJECT_PATH_CANDIDATES.items()
+}
+
+
+@pytest.fixture(scope="session")
+def bsl_verbose() -> bool:
+    """Выводить ли полные диагностические списки (например, все файлы кеша); включается переменной SERENA_TEST_VERBOSE."""
+    return os.environ.get("SERENA_TEST_VERBOSE", "").strip().lower() in ("1", "true", "yes")
+
+
+@pytest.fixture(scope="session")
+def bsl_project_paths() -> dict[str, Path | None]:
+    """Возвращает найденные пути к проектам 1С по имени проекта (None, если проект отсутствует)."""
+    return _BSL_PROJECT_PATHS
+
+
+@pytest.fixture(scope="session")
+def bsl_project_agent() -> Iterator[Callable[[Path], SerenaAgent]]:
+    """
+    Возвращает функцию, которая выдает агента с активированным проектом 1С.
+
+    Агент создается один раз на путь проекта за всю сессию, поэтому тесты разных модулей
+    не запускают языковой сервер и не ждут загрузки кеша повторно.
+    """
+    agents: dict[Path, SerenaAgent] = {}
+
+    def get_agent(project_path: Path) -> SerenaAgent:
+        agent = agents.get(project_path)
+        if agent is None:
+            agent = SerenaAgent()
+            agent.activate_project_from_path_or_name(str(project_path))
+            agents[project_path] = agent
+        return agent
+
+    yield get_agent
+
+    for agent in agents.values():
+        agent.shutdown()
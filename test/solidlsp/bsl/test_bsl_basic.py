@@ -5,10 +5,22 @@ These tests validate the functionality of the language server APIs
 like request_document_symbols using the BSL test repository.
 """
 
+import hashlib
+import os
+import shutil
+from collections.abc import Iterator
+from pathlib import Path
+
 import pytest
 
-from solidlsp import SolidLanguageServer
+from solidlsp import SolidLanguageServer, ls_types
 from solidlsp.ls_config import Language
+from solidlsp.ls_utils import PathUtils
+from solidlsp.util.cache import save_cache
+from test.conftest import get_repo_path, start_ls_context
+
+# Дополнительный модуль для тестов редактирования: два вызова процедуры Инициализация из Main.bsl в одной строке
+CALLER_MODULE = "Процедура Вызвать()\n    Инициализация(); Инициализация();\nКонецПроцедуры\n"
 
 
 @pytest.mark.bsl
@@ -21,6 +33,11 @@ class TestBSLLanguageServerBasics:
         assert language_server is not None
         assert language_server.language == Language.BSL
 
+    @pytest.mark.parametrize("language_server", [Language.BSL], indirect=True)
+    def test_bsl_wait_cache_ready(self, language_server: SolidLanguageServer) -> None:
+        """Test that the cache is reported as ready once the language server has started."""
+        assert language_server.wait_cache_ready(timeout=0)
+
     @pytest.mark.parametrize("language_server", [Language.BSL], indirect=True)
     def test_bsl_request_document_symbols_main(self, language_server: SolidLanguageServer) -> None:
         """Test request_document_symbols for Main.bsl file."""
@@ -127,6 +144,26 @@ class TestBSLLanguageServerBasics:
         assert len(utils_functions) >= 8, "Should detect functions in Utils.bsl"
         assert len(models_functions) >= 6, "Should detect functions in Models.bsl"
 
+    @pytest.mark.parametrize("language_server", [Language.BSL], indirect=True)
+    def test_bsl_symbol_uris(self, language_server: SolidLanguageServer) -> None:
+        """Test that symbol URIs (of files and directories) match the URIs built by pathlib."""
+
+        def iter_symbols(symbols: list) -> Iterator:
+            for symbol in symbols:
+                yield symbol
+                yield from iter_symbols(symbol.get("children", []))
+
+        symbols = list(iter_symbols(language_server.request_full_symbol_tree(within_relative_path=".")))
+        assert symbols
+        for symbol in symbols:
+            location = symbol["location"]
+            assert location["uri"] == Path(location["absolutePath"]).as_uri(), symbol["name"]
+
+        # directory paths (also not normalized ones) yield the same URIs as pathlib
+        for relative_path in [".", "./", "Main.bsl", "./Main.bsl", "dir/", "dir//Main.bsl"]:
+            expected_uri = Path(os.path.join(language_server.repository_root_path, relative_path)).as_uri()
+            assert language_server._get_file_uri(relative_path) == expected_uri, relative_path
+
     @pytest.mark.parametrize("language_server", [Language.BSL], indirect=True)
     def test_bsl_exported_functions_detection(self, language_server: SolidLanguageServer) -> None:
         """Test detection of exported (Экспорт) functions."""
@@ -147,14 +184,236 @@ class TestBSLLanguageServerBasics:
         for func_name in exported_function_names:
             assert func_name in detected_names, f"Should detect exported function {func_name}"
 
+    @pytest.mark.parametrize("language_server", [Language.BSL], indirect=True)
+    def test_bsl_request_symbols_by_name(self, language_server: SolidLanguageServer) -> None:
+        """Test that the symbol name index returns the same symbols as a traversal of the full symbol tree."""
+
+        def iter_tree(symbols):
+            for symbol in symbols:
+                yield symbol
+                yield from iter_tree(symbol.get("children", []))
+
+        tree_symbols = list(iter_tree(language_server.request_full_symbol_tree()))
+
+        exact_matches = language_server.request_symbols_by_name("РассчитатьСумму")
+        assert exact_matches is not None
+        assert [s["name"] for s in exact_matches] == [s["name"] for s in tree_symbols if s["name"] == "РассчитатьСумму"]
+        assert len(exact_matches) >= 1
+
+        substring_matches = language_server.request_symbols_by_name("Сумм", substring_matching=True)
+        assert [(s["name"], s["location"]["relativePath"]) for s in substring_matches] == [
+            (s["name"], s["location"]["relativePath"]) for s in tree_symbols if "Сумм" in s["name"]
+        ]
+
+        assert language_server.request_symbols_by_name("НесуществующийСимвол") == []
+
+
+@pytest.fixture
+def bsl_edit_repo(tmp_path: Path) -> Path:
+    """Copy of the BSL test repository (extended by a calling module) for tests that modify files."""
+    repo_path = tmp_path / "test_repo"
+    shutil.copytree(get_repo_path(Language.BSL), repo_path, ignore=shutil.ignore_patterns(".serena"))
+    (repo_path / "Caller.bsl").write_text(CALLER_MODULE, encoding="utf-8")
+    return repo_path
 
 
+@pytest.fixture
+def bsl_edit_ls(bsl_edit_repo: Path) -> Iterator[SolidLanguageServer]:
+    with start_ls_context(Language.BSL, str(bsl_edit_repo)) as ls:
+        yield ls
 
 
+def _read(repo_path: Path, relative_path: str) -> str:
+    return (repo_path / relative_path).read_text(encoding="utf-8")
 
 
+def _symbol_names(language_server: SolidLanguageServer, relative_path: str) -> list[str]:
+    all_symbols, _ = language_server.request_document_symbols(relative_path).get_all_symbols_and_roots()
+    return [symbol["name"] for symbol in all_symbols]
 
 
+def _reference_positions(references: list[ls_types.Location]) -> list[tuple[str, int, int]]:
+    return sorted((ref["relativePath"], ref["range"]["start"]["line"], ref["range"]["start"]["character"]) for ref in references)
 
 
+@pytest.mark.bsl
+class TestBSLLanguageServerEditing:
+    """Test the file editing operations of the BSL language server (on a temporary copy of the test repository)."""
+
+    def test_bsl_insert_and_delete_text(self, bsl_edit_ls: SolidLanguageServer, bsl_edit_repo: Path) -> None:
+        """Test that insertions and deletions are written to disk and the symbols of the file are reparsed."""
+        original = _read(bsl_edit_repo, "Caller.bsl")
+
+        new_position = bsl_edit_ls.insert_text_at_position("Caller.bsl", 3, 0, "Процедура Добавленная()\nКонецПроцедуры\n")
+        assert new_position == {"line": 5, "character": 0}
+        assert _read(bsl_edit_repo, "Caller.bsl") == original + "Процедура Добавленная()\nКонецПроцедуры\n"
+        assert "Добавленная" in _symbol_names(bsl_edit_ls, "Caller.bsl")
+
+        deleted_text = bsl_edit_ls.delete_text_between_positions("Caller.bsl", {"line": 3, "character": 0}, {"line": 5, "character": 0})
+        assert deleted_text == "Процедура Добавленная()\nКонецПроцедуры\n"
+        assert _read(bsl_edit_repo, "Caller.bsl") == original
+        assert "Добавленная" not in _symbol_names(bsl_edit_ls, "Caller.bsl")
+
+        # no temporary files of the atomic writes are left behind
+        assert not [name for name in os.listdir(bsl_edit_repo) if name.endswith(".tmp")]
+
+    def test_bsl_request_references(self, bsl_edit_ls: SolidLanguageServer) -> None:
+        """Test that references include every call site (also several calls in one line), but not the definition."""
+        references = bsl_edit_ls.request_references("Main.bsl", 83, 10)
+        assert sorted((ref["relativePath"], ref["range"]["start"]["line"], ref["range"]["start"]["character"]) for ref in references) == [
+            ("Caller.bsl", 1, 4),
+            ("Caller.bsl", 1, 21),
+            ("Main.bsl", 115, 0),
+        ]
 
+    def test_bsl_rename_symbol_edit(self, bsl_edit_ls: SolidLanguageServer) -> None:
+        """Test that the rename edit covers the definition and all call sites, grouped by file."""
+        workspace_edit = bsl_edit_ls.request_rename_symbol_edit("Main.bsl", 83, 10, "Инит")
+        assert workspace_edit is not None
+        edits_by_file = {
+            os.path.basename(PathUtils.uri_to_path(uri)): [
+                (edit["range"]["start"]["line"], edit["range"]["start"]["character"], edit["range"]["end"]["character"], edit["newText"])
+                for edit in edits
+            ]
+            for uri, edits in workspace_edit["changes"].items()
+        }
+        assert edits_by_file == {
+            "Main.bsl": [(83, 10, 23, "Инит"), (115, 0, 13, "Инит")],
+            "Caller.bsl": [(1, 4, 17, "Инит"), (1, 21, 34, "Инит")],
+        }
+
+    def test_bsl_rename_edits_are_deduplicated(self, bsl_edit_ls: SolidLanguageServer) -> None:
+        """Test that positions resolving to the same occurrence of the name produce a single edit."""
+        edits = bsl_edit_ls._build_rename_edits_for_file("Main.bsl", [(83, 10), (83, 0)], "Инициализация", "Инит")
+        assert edits == [{"range": {"start": {"line": 83, "character": 10}, "end": {"line": 83, "character": 23}}, "newText": "Инит"}]
+
+    def test_bsl_rename_to_same_name(self, bsl_edit_ls: SolidLanguageServer) -> None:
+        """Test that renaming a symbol to its current name yields no edits."""
+        assert bsl_edit_ls.request_rename_symbol_edit("Main.bsl", 83, 10, "Инициализация") == {"changes": {}}
+
+    def test_bsl_apply_text_edits(self, bsl_edit_ls: SolidLanguageServer, bsl_edit_repo: Path) -> None:
+        """Test that several unordered edits are applied at once and insertions at the same position keep their order."""
+
+        def edit(start: tuple[int, int], end: tuple[int, int], new_text: str) -> ls_types.TextEdit:
+            return {
+                "range": {"start": {"line": start[0], "character": start[1]}, "end": {"line": end[0], "character": end[1]}},
+                "newText": new_text,
+            }
+
+        bsl_edit_ls.apply_text_edits_to_file(
+            "Caller.bsl",
+            [
+                edit((1, 21), (1, 34), "Второй"),
+                edit((0, 10), (0, 17), "Выполнить"),
+                edit((1, 4), (1, 4), "А"),
+                edit((1, 4), (1, 4), "Б"),
+            ],
+        )
+
+        assert _read(bsl_edit_repo, "Caller.bsl") == "Процедура Выполнить()\n    АБИнициализация(); Второй();\nКонецПроцедуры\n"
+        assert _symbol_names(bsl_edit_ls, "Caller.bsl") == ["Выполнить"]
+
+    def test_bsl_apply_text_edits_without_changes(self, bsl_edit_ls: SolidLanguageServer, bsl_edit_repo: Path) -> None:
+        """Test that the file is not rewritten if there are no edits or the edits do not change the text."""
+        file_path = bsl_edit_repo / "Caller.bsl"
+        os.utime(file_path, ns=(1_000_000_000, 1_000_000_000))
+
+        bsl_edit_ls.apply_text_edits_to_file("Caller.bsl", [])
+        bsl_edit_ls.apply_text_edits_to_file(
+            "Caller.bsl",
+            [{"range": {"start": {"line": 1, "character": 4}, "end": {"line": 1, "character": 17}}, "newText": "Инициализация"}],
+        )
+
+        assert file_path.stat().st_mtime_ns == 1_000_000_000
+        assert _read(bsl_edit_repo, "Caller.bsl") == CALLER_MODULE
+
+    def test_bsl_request_references_in_large_file(self, bsl_edit_repo: Path) -> None:
+        """Test references in a file above the size from which lines are decoded individually."""
+        padding = "// Комментарий для увеличения размера файла\n" * 2000
+        large_module = (
+            f"Процедура ВызватьМного()\n{padding}    Инициализация();\n{padding}    Инициализация(); Инициализация();\nКонецПроцедуры\n"
+        )
+        (bsl_edit_repo / "Large.bsl").write_text(large_module, encoding="utf-8")
+
+        with start_ls_context(Language.BSL, str(bsl_edit_repo)) as ls:
+            assert os.path.getsize(bsl_edit_repo / "Large.bsl") >= ls.MMAP_LINE_READ_THRESHOLD
+            references = ls.request_references("Main.bsl", 83, 10)
+            assert sorted(
+                (ref["range"]["start"]["line"], ref["range"]["start"]["character"], ref["range"]["end"]["character"])
+                for ref in references
+                if ref["relativePath"] == "Large.bsl"
+            ) == [(2001, 4, 17), (4002, 4, 17), (4002, 21, 34)]
+
+    def test_bsl_legacy_cache_keys_are_normalized(self, bsl_edit_ls: SolidLanguageServer) -> None:
+        """Test that document symbol cache entries stored under legacy (relative_path, None) keys are loaded under the path."""
+        cache = dict(bsl_edit_ls._document_symbols_cache)
+        assert cache
+        cache_file = bsl_edit_ls.cache_dir / bsl_edit_ls.DOCUMENT_SYMBOL_CACHE_FILENAME
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        save_cache(str(cache_file), bsl_edit_ls.DOCUMENT_SYMBOL_CACHE_VERSION, {(path, None): entry for path, entry in cache.items()})
+
+        bsl_edit_ls._load_document_symbols_cache()
+
+        assert sorted(bsl_edit_ls._document_symbols_cache) == sorted(cache)
+
+    def test_bsl_find_all_bsl_files(self, bsl_edit_ls: SolidLanguageServer, bsl_edit_repo: Path) -> None:
+        """Test that BSL files are collected recursively, skipping ignored directories and other file types."""
+        (bsl_edit_repo / "src" / "cf" / "Модуль").mkdir(parents=True)
+        (bsl_edit_repo / "src" / "cf" / "Модуль" / "Module.bsl").write_text(CALLER_MODULE, encoding="utf-8")
+        (bsl_edit_repo / "src" / "cf" / "Модуль" / "Module.os").write_text(CALLER_MODULE, encoding="utf-8")
+        (bsl_edit_repo / "build").mkdir()
+        (bsl_edit_repo / "build" / "Generated.bsl").write_text(CALLER_MODULE, encoding="utf-8")
+
+        bsl_files = bsl_edit_ls._find_all_bsl_files()
+
+        assert "src/cf/Модуль/Module.bsl" in bsl_files
+        assert "Caller.bsl" in bsl_files
+        assert not any(path.startswith("build/") or not path.endswith(".bsl") for path in bsl_files)
+        assert bsl_edit_ls._get_abs_path("src/cf/Модуль/Module.bsl") == os.path.join(
+            str(bsl_edit_repo), "src", "cf", "Модуль", "Module.bsl"
+        )
+        assert [rel_path for rel_path, _ in bsl_edit_ls._iter_bsl_files(str(bsl_edit_repo / "src"))] == ["src/cf/Модуль/Module.bsl"]
+
+    def test_bsl_symbol_body_is_not_stored(self, bsl_edit_ls: SolidLanguageServer, bsl_edit_repo: Path) -> None:
+        """Test that bodies written into cached method symbols are ignored and that stale ranges yield no body."""
+        all_symbols, _ = bsl_edit_ls.request_document_symbols("Main.bsl").get_all_symbols_and_roots()
+        symbol = next(s for s in all_symbols if s["name"] == "ПриветствоватьПользователя")
+        body = symbol["body"]
+        assert "ПриветствоватьПользователя" in body
+
+        symbol["body"] = "stale"
+        assert symbol["body"] == body
+
+        (bsl_edit_repo / "Main.bsl").write_text("// пусто\n", encoding="utf-8")
+        assert symbol.get("body") is None
+
+    def test_bsl_compute_file_hash(self, bsl_edit_ls: SolidLanguageServer, bsl_edit_repo: Path) -> None:
+        """Test that the file hash is the MD5 of the UTF-8 encoded text with normalized line endings."""
+        contents = {
+            "Crlf.bsl": "\ufeffПроцедура А()\r\nКонецПроцедуры\rКонец\n".encode(),
+            "Invalid.bsl": "Процедура Б()\r".encode() + b"\xff\n" + "КонецПроцедуры".encode(),
+        }
+        for relative_path, data in contents.items():
+            (bsl_edit_repo / relative_path).write_bytes(data)
+            with open(bsl_edit_repo / relative_path, encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+
+            assert bsl_edit_ls._compute_file_hash(relative_path) == hashlib.md5(text.encode("utf-8")).hexdigest()
+
+    def test_bsl_index_files_with_parse_processes(self, bsl_edit_ls: SolidLanguageServer) -> None:
+        """Test that indexing with a process pool for parsing yields the same symbols and references as in-thread parsing."""
+        expected_symbols = {path: _symbol_names(bsl_edit_ls, path) for path in ("Main.bsl", "Caller.bsl")}
+        expected_references = _reference_positions(bsl_edit_ls.request_references("Main.bsl", 83, 10))
+        for path in expected_symbols:
+            with bsl_edit_ls._symbol_caches_transaction(raw=True, document=True):
+                bsl_edit_ls._document_symbols_cache.pop(path)
+                bsl_edit_ls._raw_document_symbols_cache.pop(path, None)
+            bsl_edit_ls._local_cache.remove_file_data(path)
+            bsl_edit_ls._converted_files.discard(path)
+
+        bsl_edit_ls.parse_processes = 2
+        results = bsl_edit_ls._index_files_with_local_parser(list(expected_symbols))
+
+        assert results == {path: None for path in expected_symbols}
+        assert {path: _symbol_names(bsl_edit_ls, path) for path in expected_symbols} == expected_symbols
+        assert _reference_positions(bsl_edit_ls.request_references("Main.bsl", 83, 10)) == expected_references
@@ -14,8 +14,8 @@ from pathlib import Path
 import pytest
 
 from serena.agent import SerenaAgent
-from serena.project import Project
 from serena.tools.symbol_tools import FindSymbolTool
+from solidlsp.ls_config import Language
 
 
 @pytest.mark.bsl
@@ -23,37 +23,18 @@ class TestBSLCacheFindSymbol:
     """Тест для проверки построения кеша и поиска символов через find_symbol."""
 
     @pytest.fixture(scope="class")
-    def test_project_path(self) -> Path:
+    def test_project_path(self, bsl_project_paths: dict[str, Path | None]) -> Path:
         """Возвращает путь к тестовому проекту."""
-        # Путь к проекту 1C (проверяем оба варианта: Windows и Docker)
-        project_paths = [
-            Path(r"D:\1C\BASE"),  # Windows путь
-            Path("/workspaces/serena/1C/BASE"),  # Docker путь
-        ]
-        
-        for project_path in project_paths:
-            if project_path.exists():
-                return project_path
-        
-        # Если ни один путь не найден, пропускаем тест
-        pytest.skip(f"Test project not found at any of: {[str(p) for p in project_paths]}")
-
-    @pytest.fixture(scope="class")
-    def project(self, test_project_path: Path) -> Project:
-        """Создает проект для тестирования."""
-        project = Project.load(str(test_project_path))
-        return project
+        project_path = bsl_project_paths["BASE"]
+        if project_path is None:
+            # Если проект не найден, пропускаем тест
+            pytest.skip(f"Test project BASE not found")
+        return project_path
 
     @pytest.fixture(scope="class")
-    def agent(self, project: Project) -> SerenaAgent:
-        """Создает агент для тестирования."""
-        # Создаем агент без проекта (он загрузит проект сам)
-        agent = SerenaAgent()
-        # Активируем проект по пути, чтобы запустить индексацию
-        agent.activate_project_from_path_or_name(project.project_root)
-        # Ждем немного, чтобы индексация началась
-        time.sleep(2)
-        return agent
+    def agent(self, test_project_path: Path, bsl_project_agent) -> SerenaAgent:
+        """Возвращает общий для сессии агент с активированным проектом."""
+        return bsl_project_agent(test_project_path)
 
     def test_build_cache_from_src_cf(self, agent: SerenaAgent, test_project_path: Path):
         """Тест 1: Построение кеша из данных в папке src/cf."""
@@ -63,71 +44,38 @@ class TestBSLCacheFindSymbol:
         
         # Ждем инициализации менеджера языковых серверов (инициализируется асинхронно)
         max_wait = 60  # Максимум 60 секунд
-        wait_interval = 1  # Проверяем каждую секунду
-        elapsed = 0
-        ls_manager = None
-        
-        while elapsed < max_wait:
-            ls_manager = agent.get_language_server_manager()
-            if ls_manager is not None:
-                break
-            time.sleep(wait_interval)
-            elapsed += wait_interval
+        ls_manager = agent.wait_for_language_server_manager(timeout=max_wait)
         
-        assert ls_manager is not None, f"Language server manager should be initialized (waited {elapsed}s)"
+        assert ls_manager is not None, f"Language server manager should be initialized (waited up to {max_wait}s)"
         
         # Находим BSL language server
-        bsl_ls = None
-        for ls in ls_manager.iter_language_servers():
-            if ls.language.value == "bsl":
-                bsl_ls = ls
-                break
+        bsl_ls = ls_manager.get_language_server_for_language(Language.BSL)
         
         assert bsl_ls is not None, "BSL language server should be initialized"
         
         # Ждем завершения индексации (если она еще идет)
-        # Проверяем наличие кеша
         cache_file = bsl_ls.cache_dir / bsl_ls.DOCUMENT_SYMBOL_CACHE_FILENAME
         max_wait_time = 300  # 5 минут максимум
-        wait_interval = 5  # Проверяем каждые 5 секунд
-        elapsed = 0
-        
-        while elapsed < max_wait_time:
-            if cache_file.exists():
-                # Проверяем, что кеш не пустой
-                cache_size = len(bsl_ls._document_symbols_cache)
-                if cache_size > 0:
-                    print(f"\n[OK] Cache built successfully: {cache_size} entries")
-                    break
-            time.sleep(wait_interval)
-            elapsed += wait_interval
-            print(f"Waiting for cache to be built... ({elapsed}s)")
+        assert bsl_ls.wait_cache_ready(timeout=max_wait_time), f"Cache should be built within {max_wait_time}s"
+        cache_size = len(bsl_ls._document_symbols_cache)
+        print(f"\n[OK] Cache built successfully: {cache_size} entries")
         
         assert cache_file.exists(), f"Cache file should exist at {cache_file}"
-        assert len(bsl_ls._document_symbols_cache) > 0, "Cache should not be empty"
+        assert cache_size > 0, "Cache should not be empty"
         
         print(f"\nCache statistics:")
         print(f"  - Cache file: {cache_file}")
-        print(f"  - Cache entries: {len(bsl_ls._document_symbols_cache)}")
+        print(f"  - Cache entries: {cache_size}")
         print(f"  - Cache directory: {bsl_ls.cache_dir}")
 
     def test_find_symbol_40_times(self, agent: SerenaAgent):
         """Тест 2 и 3: Вызов find_symbol 40 раз для поиска данных в кеше."""
         # Ждем инициализации менеджера языковых серверов (инициализируется асинхронно)
         max_wait = 60  # Максимум 60 секунд
-        wait_interval = 1  # Проверяем каждую секунду
-        elapsed = 0
-        ls_manager = None
-        
-        while elapsed < max_wait:
-            ls_manager = agent.get_language_server_manager()
-            if ls_manager is not None:
-                break
-            time.sleep(wait_interval)
-            elapsed += wait_interval
+        ls_manager = agent.wait_for_language_server_manager(timeout=max_wait)
         
         if ls_manager is None:
-            pytest.fail(f"Language server manager not initialized after {elapsed}s")
+            pytest.fail(f"Language server manager not initialized after {max_wait}s")
         
         # Создаем инструмент find_symbol
         find_symbol_tool = FindSymbolTool(agent=agent)
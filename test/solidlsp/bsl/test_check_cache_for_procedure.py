@@ -2,143 +2,111 @@
 Тест для проверки наличия процедуры в кеше.
 """
 
-import time
-from pathlib import Path
-
 import pytest
 
-from serena.agent import SerenaAgent
+from solidlsp.ls_config import Language
+
+_COMMON_MODULES_DIR = "/CommonModules/"
+
+
+def _index_cache_by_path(cache: dict[str, tuple]) -> dict[str, tuple]:
+    """Строит индекс записей кеша DocumentSymbols по нормализованному относительному пути (один проход по кешу)."""
+    return {path.replace("\\", "/"): value for path, value in cache.items()}
+
+
+def _common_module_name(path: str) -> str:
+    """Возвращает имя общего модуля (каталог после CommonModules) для пути к файлу модуля."""
+    return path.split(_COMMON_MODULES_DIR, 1)[-1].split("/", 1)[0]
 
 
 @pytest.mark.bsl
-def test_check_procedure_in_cache():
+def test_check_procedure_in_cache(bsl_project_paths, bsl_project_agent, bsl_verbose: bool):
     """Проверяет, есть ли процедура УстановитьОграничениеТиповЭлементовАналитикПремирования в кеше."""
     procedure_name = "УстановитьОграничениеТиповЭлементовАналитикПремирования"
+    procedure_name_lower = procedure_name.lower()  # приводим искомое имя к нижнему регистру один раз
     target_file = "src/cf/CommonModules/ibs_МодульПремированияКлиентСервер/Ext/Module.bsl"
     
     # Путь к проекту
-    project_path = Path(r"D:\1C\BASE")
-    if not project_path.exists():
-        pytest.skip(f"Test project not found at {project_path}")
+    project_path = bsl_project_paths["BASE"]
+    if project_path is None:
+        pytest.skip("Test project BASE not found")
     
-    # Создаем агент
-    agent = SerenaAgent()
-    agent.activate_project_from_path_or_name(str(project_path))
+    # Берем общий для сессии агент (языковой сервер запускается один раз на проект)
+    agent = bsl_project_agent(project_path)
     
     # Ждем инициализации менеджера языковых серверов
     max_wait = 60
-    wait_interval = 1
-    elapsed = 0
-    ls_manager = None
-    
-    while elapsed < max_wait:
-        ls_manager = agent.get_language_server_manager()
-        if ls_manager is not None:
-            break
-        time.sleep(wait_interval)
-        elapsed += wait_interval
+    ls_manager = agent.wait_for_language_server_manager(timeout=max_wait)
     
     if ls_manager is None:
-        pytest.fail(f"Language server manager not initialized after {elapsed}s")
+        pytest.fail(f"Language server manager not initialized after {max_wait}s")
     
     # Находим BSL language server
-    bsl_ls = None
-    for ls in ls_manager.iter_language_servers():
-        if ls.language.value == "bsl":
-            bsl_ls = ls
-            break
+    bsl_ls = ls_manager.get_language_server_for_language(Language.BSL)
     
     if bsl_ls is None:
         pytest.fail("BSL language server not found")
     
-    # Ждем завершения индексации (если она еще идет)
+    # Ждем завершения индексации (сервер сигнализирует о готовности кеша событием)
     print(f"\nОжидание завершения индексации...")
-    cache_file = bsl_ls.cache_dir / bsl_ls.DOCUMENT_SYMBOL_CACHE_FILENAME
     max_wait_time = 300  # 5 минут максимум
-    wait_interval = 5  # Проверяем каждые 5 секунд
-    elapsed = 0
-    
-    while elapsed < max_wait_time:
-        if cache_file.exists():
-            cache_size = len(bsl_ls._document_symbols_cache)
-            if cache_size > 0:
-                # Проверяем, увеличивается ли размер кеша (индексация идет)
-                time.sleep(wait_interval)
-                new_cache_size = len(bsl_ls._document_symbols_cache)
-                if new_cache_size == cache_size:
-                    # Размер не изменился, индексация завершена
-                    print(f"Индексация завершена. Размер кеша: {cache_size}")
-                    break
-        time.sleep(wait_interval)
-        elapsed += wait_interval
-        print(f"  Ожидание... ({elapsed}s, размер кеша: {len(bsl_ls._document_symbols_cache)})")
+    if not bsl_ls.wait_cache_ready(timeout=max_wait_time):
+        pytest.fail(f"Indexing not finished after {max_wait_time}s")
+    cache_size = len(bsl_ls._document_symbols_cache)  # размер кеша считываем один раз
+    print(f"Индексация завершена. Размер кеша: {cache_size}")
     
     print(f"\n{'='*80}")
     print(f"Проверка кеша для процедуры: {procedure_name}")
     print(f"{'='*80}")
-    print(f"Размер кеша: {len(bsl_ls._document_symbols_cache)} записей")
+    print(f"Размер кеша: {cache_size} записей")
     
-    # Ищем файл в кеше
+    # Ищем файл в кеше по индексу путей (без перебора всех записей кеша)
     found_file = False
     found_procedure = False
     
-    for cache_key, (file_hash, doc_symbols) in bsl_ls._document_symbols_cache.items():
-        if isinstance(cache_key, tuple):
-            file_path = cache_key[0]
-        else:
-            file_path = cache_key
+    cache_index = _index_cache_by_path(bsl_ls._document_symbols_cache)
+    file_path = target_file
+    cache_entry = cache_index.get(target_file)
+    if cache_entry is None:
+        # Путь в кеше может отличаться префиксом - ищем по имени общего модуля
+        cache_index_by_module = {
+            _common_module_name(path): (path, entry) for path, entry in cache_index.items() if _COMMON_MODULES_DIR in path
+        }
+        file_path, cache_entry = cache_index_by_module.get(_common_module_name(target_file), (target_file, None))
+    
+    if cache_entry is not None:
+        file_hash, doc_symbols = cache_entry
+        found_file = True
+        print(f"\n[OK] Файл найден в кеше: {file_path}")
+        print(f"     Hash: {file_hash[:16]}...")
         
-        # Проверяем, это ли нужный файл
-        if "МодульПремирования" in file_path or "ibs_МодульПремирования" in file_path:
-            found_file = True
-            print(f"\n[OK] Файл найден в кеше: {file_path}")
-            print(f"     Hash: {file_hash[:16]}...")
+        if doc_symbols and doc_symbols.root_symbols:
+            print(f"     Символов в файле: {len(doc_symbols.root_symbols)}")
             
-            if doc_symbols and doc_symbols.root_symbols:
-                print(f"     Символов в файле: {len(doc_symbols.root_symbols)}")
-                
-                # Функция для рекурсивного поиска символов
-                def search_symbols(symbols, depth=0):
-                    nonlocal found_procedure
-                    indent = "  " * depth
-                    for symbol in symbols:
-                        symbol_name = getattr(symbol, 'name', 'Unknown')
-                        symbol_kind = getattr(symbol, 'kind', 'Unknown')
-                        
-                        # Проверяем, это ли нужная процедура
-                        if procedure_name.lower() in symbol_name.lower() or symbol_name == procedure_name:
-                            found_procedure = True
-                            print(f"{indent}[MATCH] {symbol_name} (kind: {symbol_kind})")
-                            if hasattr(symbol, 'start_line'):
-                                print(f"{indent}       Строка: {symbol.start_line}")
-                            if hasattr(symbol, 'children') and symbol.children:
-                                print(f"{indent}       Дочерних символов: {len(symbol.children)}")
-                        else:
-                            print(f"{indent}- {symbol_name} (kind: {symbol_kind})")
-                        
-                        # Рекурсивно проверяем дочерние символы
-                        if hasattr(symbol, 'children') and symbol.children:
-                            search_symbols(symbol.children, depth + 1)
-                
-                search_symbols(doc_symbols.root_symbols)
-                
-                if not found_procedure:
-                    print(f"\n[WARNING] Процедура '{procedure_name}' не найдена в символах файла!")
-                    print(f"          Но файл присутствует в кеше.")
-            else:
-                print(f"     [WARNING] Файл в кеше, но символы отсутствуют!")
+            # Обходим дерево символов итеративно и выводим только совпадения
+            for symbol in doc_symbols.iter_symbols():
+                symbol_name = symbol["name"]
+                if procedure_name_lower in symbol_name.lower():
+                    found_procedure = True
+                    print(f"[MATCH] {symbol_name} (kind: {symbol['kind']})")
+                    if "range" in symbol:
+                        print(f"       Строка: {symbol['range']['start']['line']}")
+                    if symbol.get("children"):
+                        print(f"       Дочерних символов: {len(symbol['children'])}")
             
-            break
+            if not found_procedure:
+                print(f"\n[WARNING] Процедура '{procedure_name}' не найдена в символах файла!")
+                print(f"          Но файл присутствует в кеше.")
+        else:
+            print(f"     [WARNING] Файл в кеше, но символы отсутствуют!")
     
     if not found_file:
         print(f"\n[ERROR] Файл {target_file} не найден в кеше!")
-        print(f"\nВсе файлы в кеше:")
-        for i, (cache_key, (file_hash, doc_symbols)) in enumerate(bsl_ls._document_symbols_cache.items(), 1):
-            if isinstance(cache_key, tuple):
-                file_path = cache_key[0]
-            else:
-                file_path = cache_key
-            print(f"  {i}. {file_path}")
+        if bsl_verbose:
+            print(f"\nВсе файлы в кеше:")
+            print("\n".join(f"  {i}. {path}" for i, path in enumerate(cache_index, 1)))
+        else:
+            print(f"\nВ кеше {len(cache_index)} файлов (полный список выводится при SERENA_TEST_VERBOSE=1)")
     
     print(f"\n{'='*80}")
     print(f"Итоги:")
@@ -1,84 +1,59 @@
 """Тест поиска процедуры РассчитатьЗначенияПоказателей из кеша."""
 
+import itertools
 import os
+import re
 import time
 from pathlib import Path
 import pytest
-import json
 from serena.agent import SerenaAgent
 from serena.tools.symbol_tools import FindSymbolTool
+from solidlsp.ls_config import Language
 
 @pytest.mark.bsl
 class TestFindRaschitatZnacheniya:
     @pytest.fixture(scope="class")
-    def test_project_path(self) -> Path:
-        project_paths = [
-            Path(r"D:\1C\RZDZUP"),
-            Path("/workspaces/serena/1C/RZDZUP"),
-        ]
-        for project_path in project_paths:
-            if project_path.exists():
-                print(f"\nИспользуется путь к проекту: {project_path}")
-                return project_path
-        pytest.fail(f"Путь к проекту не найден. Пробовали: {project_paths}")
+    def test_project_path(self, bsl_project_paths: dict[str, Path | None]) -> Path:
+        project_path = bsl_project_paths["RZDZUP"]
+        if project_path is None:
+            pytest.fail("Путь к проекту RZDZUP не найден")
+        print(f"\nИспользуется путь к проекту: {project_path}")
+        return project_path
 
     @pytest.fixture(scope="class")
-    def agent(self, test_project_path: Path) -> SerenaAgent:
-        agent = SerenaAgent()
-        agent.activate_project_from_path_or_name(str(test_project_path))
+    def agent(self, test_project_path: Path, bsl_project_agent) -> SerenaAgent:
+        agent = bsl_project_agent(test_project_path)
         
         # Ждем инициализации менеджера языковых серверов (инициализируется асинхронно)
         max_wait = 60  # Максимум 60 секунд
-        wait_interval = 1  # Проверяем каждую секунду
-        elapsed = 0
-        ls_manager = None
+        ls_manager = agent.wait_for_language_server_manager(timeout=max_wait)
         
-        while elapsed < max_wait:
-            ls_manager = agent.get_language_server_manager()
-            if ls_manager is not None:
-                break
-            time.sleep(wait_interval)
-            elapsed += wait_interval
-        
-        assert ls_manager is not None, f"Менеджер языкового сервера не инициализирован после {elapsed}s"
+        assert ls_manager is not None, f"Менеджер языкового сервера не инициализирован после {max_wait}s"
         
-        bsl_ls = None
-        for ls in ls_manager.iter_language_servers():
-            if ls.language.value == "bsl":
-                bsl_ls = ls
-                break
+        bsl_ls = ls_manager.get_language_server_for_language(Language.BSL)
         assert bsl_ls is not None, "BSL языковой сервер должен быть инициализирован"
 
-        # Проверяем наличие кеша
+        # Ждем загрузки кеша (сервер сигнализирует о готовности кеша событием)
         cache_file = bsl_ls.cache_dir / bsl_ls.DOCUMENT_SYMBOL_CACHE_FILENAME
         max_wait_time = 60
-        wait_interval = 2
-        elapsed = 0
+        cache_ready = bsl_ls.wait_cache_ready(timeout=max_wait_time)
+        cache_size = len(bsl_ls._document_symbols_cache)  # размер кеша считываем один раз
+        if cache_ready:
+            print(f"\n[OK] Кеш загружен: {cache_size} записей")
         
-        while elapsed < max_wait_time:
-            if cache_file.exists():
-                # Загружаем кеш
-                bsl_ls._load_document_symbols_cache()
-                cache_size = len(bsl_ls._document_symbols_cache)
-                if cache_size > 0:
-                    print(f"\n[OK] Кеш загружен: {cache_size} записей")
-                    break
-            time.sleep(wait_interval)
-            elapsed += wait_interval
-            print(f"Ожидание загрузки кеша... ({elapsed}s, текущий размер кеша: {len(bsl_ls._document_symbols_cache)})")
-        
-        if not cache_file.exists() or len(bsl_ls._document_symbols_cache) == 0:
+        if not cache_file.exists() or cache_size == 0:
             pytest.fail("Кеш не найден или пуст после ожидания.")
 
         print("\nСтатистика кеша:")
         print(f"  - Файл кеша: {cache_file}")
-        print(f"  - Записей в кеше: {len(bsl_ls._document_symbols_cache)}")
+        print(f"  - Записей в кеше: {cache_size}")
         print(f"  - Директория кеша: {bsl_ls.cache_dir}")
         
         return agent
 
     def test_find_procedure_raschitat_znacheniya(self, agent: SerenaAgent):
         procedure_name = "РассчитатьЗначенияПоказателей"
+        procedure_name_lower = procedure_name.lower()  # приводим искомое имя к нижнему регистру один раз
         find_symbol_tool = FindSymbolTool(agent=agent)
         
         print(f"\n{'='*80}")
@@ -88,15 +63,14 @@ class TestFindRaschitatZnacheniya:
         start_time = time.time()
         symbols = []
         try:
-            # Пробуем сначала точный поиск
-            result_json = find_symbol_tool.apply(procedure_name, include_body=True, substring_matching=False)
-            symbols = json.loads(result_json)
-            
-            # Если не найдено, пробуем поиск по подстроке
+            # Один поиск по подстроке: точные совпадения входят в его результат, поэтому
+            # отдаем предпочтение им и используем совпадения по подстроке только при их отсутствии
+            substring_symbols = find_symbol_tool.find_symbol_dicts(procedure_name, include_body=False, substring_matching=True)
+            # (словари результата не содержат поля name, имя символа - последний сегмент name_path)
+            symbols = [s for s in substring_symbols if s['name_path'].rsplit('/', 1)[-1] == procedure_name]
             if len(symbols) == 0:
-                print(f"Точный поиск не дал результатов, пробуем поиск по подстроке...")
-                result_json = find_symbol_tool.apply(procedure_name, include_body=True, substring_matching=True)
-                symbols = json.loads(result_json)
+                print(f"Точных совпадений нет, используем совпадения по подстроке...")
+                symbols = substring_symbols
         except Exception as e:
             print(f"Ошибка при вызове find_symbol: {e}")
             import traceback
@@ -114,26 +88,22 @@ class TestFindRaschitatZnacheniya:
         if len(symbols) == 0:
             print(f"\n[ERROR] Процедура '{procedure_name}' не найдена!")
             
-            bsl_ls = None
             ls_manager = agent.get_language_server_manager()
-            if ls_manager:
-                for ls in ls_manager.iter_language_servers():
-                    if ls.language.value == "bsl":
-                        bsl_ls = ls
-                        break
+            bsl_ls = ls_manager.get_language_server_for_language(Language.BSL) if ls_manager else None
             
             if bsl_ls:
                 print(f"\nПроверяем кеш напрямую...")
                 print(f"  - Записей в кеше: {len(bsl_ls._document_symbols_cache)}")
                 
                 # Ищем файлы, которые могут содержать эту процедуру
+                # (регистронезависимый поиск подстроки одним скомпилированным шаблоном, без lower() для каждого имени)
+                find_procedure_name = re.compile(re.escape(procedure_name), re.IGNORECASE).search
                 found_files = []
-                for cache_key, (file_hash, doc_symbols) in bsl_ls._document_symbols_cache.items():
-                    relative_file_path = cache_key[0] if isinstance(cache_key, tuple) else cache_key
+                for relative_file_path, (file_hash, doc_symbols) in bsl_ls._document_symbols_cache.items():
                     if doc_symbols and doc_symbols.root_symbols:
                         for symbol in doc_symbols.root_symbols:
-                            symbol_name = symbol.get('name', 'Unknown')
-                            if procedure_name.lower() in symbol_name.lower():
+                            symbol_name = symbol['name']
+                            if find_procedure_name(symbol_name):
                                 found_files.append((relative_file_path, symbol_name))
                                 print(f"\n  [OK] Найдено совпадение в файле: {relative_file_path}")
                                 print(f"      Символ: {symbol_name}")
@@ -141,10 +111,11 @@ class TestFindRaschitatZnacheniya:
                 if not found_files:
                     print(f"\n  [ERROR] Процедура '{procedure_name}' не найдена в кеше!")
                     print(f"\n  Первые 10 файлов в кеше:")
-                    for i, (cache_key, (file_hash, doc_symbols)) in enumerate(list(bsl_ls._document_symbols_cache.items())[:10]):
-                        relative_file_path = cache_key[0] if isinstance(cache_key, tuple) else cache_key
+                    lines = []
+                    for i, (relative_file_path, (file_hash, doc_symbols)) in enumerate(itertools.islice(bsl_ls._document_symbols_cache.items(), 10)):
                         symbol_count = len(doc_symbols.root_symbols) if doc_symbols and doc_symbols.root_symbols else 0
-                        print(f"    {i+1}. {relative_file_path} ({symbol_count} символов)")
+                        lines.append(f"    {i+1}. {relative_file_path} ({symbol_count} символов)")
+                    print("\n".join(lines))
             
             pytest.fail(f"Процедура '{procedure_name}' не найдена")
         
@@ -152,31 +123,34 @@ class TestFindRaschitatZnacheniya:
         print(f"Всего символов: {len(symbols)}")
         found_exact_match = False
         for i, symbol in enumerate(symbols, 1):
-            # Получаем имя символа (теперь поле name должно быть доступно)
-            symbol_name = symbol.get('name', 'Unknown')
-            name_path = symbol.get('name_path', 'Unknown')
+            # Словари результата не содержат поля name: имя символа - последний сегмент name_path
+            name_path = symbol['name_path']
+            symbol_name = name_path.rsplit('/', 1)[-1]
             print(f"\n  [{i}] Имя: {symbol_name}")
             print(f"      Путь: {name_path}")
             print(f"      Тип: {symbol.get('kind_name', symbol.get('kind', 'Unknown'))}")
             print(f"      Файл: {symbol.get('relative_path', 'Unknown')}")
-            if 'body' in symbol:
-                body_preview = symbol['body'][:200] if len(symbol['body']) > 200 else symbol['body']
-                print(f"      Тело (первые 200 символов): {body_preview}...")
+            # Тело процедуры не запрашиваем (тест его не проверяет), выводим только его расположение
+            body_location = symbol.get('body_location', {})
+            print(f"      Строки: {body_location.get('start_line', 'Unknown')}-{body_location.get('end_line', 'Unknown')}")
             
             # Проверяем точное совпадение или совпадение по подстроке
-            if symbol_name and symbol_name.lower() == procedure_name.lower():
+            # (путь приводится к нижнему регистру один раз, имя символа - его последний сегмент)
+            name_path_lower = name_path.lower()
+            symbol_name_lower = name_path_lower.rsplit('/', 1)[-1]
+            if symbol_name_lower and symbol_name_lower == procedure_name_lower:
                 found_exact_match = True
                 print(f"      [MATCH] Точное совпадение найдено!")
-            elif symbol_name and procedure_name.lower() in symbol_name.lower():
+            elif symbol_name_lower and procedure_name_lower in symbol_name_lower:
                 found_exact_match = True
                 print(f"      [MATCH] Совпадение по подстроке найдено!")
-            elif name_path and procedure_name.lower() in name_path.lower():
+            elif name_path_lower and procedure_name_lower in name_path_lower:
                 found_exact_match = True
                 print(f"      [MATCH] Совпадение в name_path найдено!")
         
         assert len(symbols) > 0, f"Процедура '{procedure_name}' должна быть найдена"
         assert found_exact_match or any(
-            procedure_name.lower() in (s.get('name', '') or s.get('name_path', '')).lower() 
+            procedure_name_lower in s['name_path'].lower()
             for s in symbols
         ), f"Процедура '{procedure_name}' не найдена среди результатов поиска. Найдено символов: {len(symbols)}"
 
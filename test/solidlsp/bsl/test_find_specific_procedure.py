@@ -11,6 +11,7 @@ import pytest
 from serena.agent import SerenaAgent
 from serena.project import Project
 from serena.tools.symbol_tools import FindSymbolTool
+from solidlsp.ls_config import Language
 
 
 @pytest.mark.bsl
@@ -18,35 +19,23 @@ class TestFindSpecificProcedure:
     """Тест для поиска конкретной процедуры."""
 
     @pytest.fixture(scope="class")
-    def test_project_path(self) -> Path:
+    def test_project_path(self, bsl_project_paths: dict[str, Path | None]) -> Path:
         """Возвращает путь к тестовому проекту."""
-        # Путь к проекту 1C (проверяем оба варианта: Windows и Docker)
-        project_paths = [
-            Path(r"D:\1C\BASE"),  # Windows путь
-            Path("/workspaces/serena/1C/BASE"),  # Docker путь
-        ]
-        
-        for project_path in project_paths:
-            if project_path.exists():
-                return project_path
-        
-        # Если ни один путь не найден, пропускаем тест
-        pytest.skip(f"Test project not found at any of: {[str(p) for p in project_paths]}")
+        project_path = bsl_project_paths["BASE"]
+        if project_path is None:
+            # Если проект не найден, пропускаем тест
+            pytest.skip(f"Test project BASE not found")
+        return project_path
 
     @pytest.fixture(scope="class")
-    def agent(self, test_project_path: Path) -> SerenaAgent:
-        """Создает агент для тестирования."""
-        # Создаем агент без проекта (он загрузит проект сам)
-        agent = SerenaAgent()
-        # Активируем проект по пути, чтобы запустить индексацию
-        agent.activate_project_from_path_or_name(str(test_project_path))
-        # Ждем немного, чтобы индексация началась
-        time.sleep(2)
-        return agent
+    def agent(self, test_project_path: Path, bsl_project_agent) -> SerenaAgent:
+        """Возвращает общий для сессии агент с активированным проектом."""
+        return bsl_project_agent(test_project_path)
 
-    def test_find_procedure(self, agent: SerenaAgent, test_project_path: Path):
+    def test_find_procedure(self, agent: SerenaAgent, test_project_path: Path, bsl_verbose: bool):
         """Тест поиска процедуры УстановитьОграничениеТиповЭлементовАналитикПремирования."""
         procedure_name = "УстановитьОграничениеТиповЭлементовАналитикПремирования"
+        procedure_name_lower = procedure_name.lower()  # приводим искомое имя к нижнему регистру один раз
         
         print(f"\n{'='*80}")
         print(f"Поиск процедуры: {procedure_name}")
@@ -54,19 +43,10 @@ class TestFindSpecificProcedure:
         
         # Ждем инициализации менеджера языковых серверов (инициализируется асинхронно)
         max_wait = 60  # Максимум 60 секунд
-        wait_interval = 1  # Проверяем каждую секунду
-        elapsed = 0
-        ls_manager = None
-        
-        while elapsed < max_wait:
-            ls_manager = agent.get_language_server_manager()
-            if ls_manager is not None:
-                break
-            time.sleep(wait_interval)
-            elapsed += wait_interval
+        ls_manager = agent.wait_for_language_server_manager(timeout=max_wait)
         
         if ls_manager is None:
-            pytest.fail(f"Language server manager not initialized after {elapsed}s")
+            pytest.fail(f"Language server manager not initialized after {max_wait}s")
         
         # Создаем инструмент find_symbol
         find_symbol_tool = FindSymbolTool(agent=agent)
@@ -76,22 +56,18 @@ class TestFindSpecificProcedure:
         start_time = time.time()
         
         try:
-            result = find_symbol_tool.apply(
+            # Получаем словари символов напрямую, без сериализации в JSON и обратного разбора
+            symbols = find_symbol_tool.find_symbol_dicts(
                 name_path_pattern=procedure_name,
                 depth=0,
                 relative_path="",
-                include_body=True,  # Включаем тело процедуры
+                include_body=False,  # Тело процедуры не нужно: тест проверяет только имя и расположение
                 include_kinds=[],
                 exclude_kinds=[],
                 substring_matching=True,
-                max_answer_chars=-1,
             )
             elapsed_time = time.time() - start_time
             
-            # Парсим результат (JSON строка)
-            import json
-            symbols = json.loads(result)
-            
             print(f"\n{'='*80}")
             print(f"Результаты поиска:")
             print(f"{'='*80}")
@@ -103,11 +79,7 @@ class TestFindSpecificProcedure:
                 print(f"\nПроверяем кеш...")
                 
                 # Проверяем кеш напрямую
-                bsl_ls = None
-                for ls in ls_manager.iter_language_servers():
-                    if ls.language.value == "bsl":
-                        bsl_ls = ls
-                        break
+                bsl_ls = ls_manager.get_language_server_for_language(Language.BSL)
                 
                 if bsl_ls:
                     cache_size = len(bsl_ls._document_symbols_cache)
@@ -115,83 +87,83 @@ class TestFindSpecificProcedure:
                     
                     # Проверяем, есть ли файл с процедурой в кеше
                     target_file = "src/cf/CommonModules/ibs_МодульПремированияКлиентСервер/Ext/Module.bsl"
-                    found_in_cache = False
-                    for cache_key, (file_hash, doc_symbols) in bsl_ls._document_symbols_cache.items():
-                        if isinstance(cache_key, tuple):
-                            file_path = cache_key[0]
-                        else:
-                            file_path = cache_key
+                    # Ключи кеша - относительные пути, поэтому сначала ищем целевой файл прямым обращением по ключу
+                    cache_hit = bsl_ls._document_symbols_cache.get(target_file)
+                    if cache_hit is not None:
+                        cached_files = [(target_file, cache_hit)]
+                    else:
+                        # Полный просмотр кеша только если файла нет под ожидаемым путем
+                        # (имя с префиксом ibs_ тоже содержит эту подстроку)
+                        cached_files = [
+                            (file_path, entry)
+                            for file_path, entry in bsl_ls._document_symbols_cache.items()
+                            if "МодульПремирования" in file_path
+                        ]
+                    found_in_cache = bool(cached_files)
+                    for file_path, (file_hash, doc_symbols) in cached_files:
+                        print(f"\n  [OK] Файл найден в кеше: {file_path}")
                         
-                        # Проверяем, содержит ли путь нужный файл
-                        if "МодульПремирования" in file_path or "ibs_МодульПремирования" in file_path:
-                            found_in_cache = True
-                            print(f"\n  [OK] Файл найден в кеше: {file_path}")
-                            
-                            # Проверяем символы в этом файле
-                            if doc_symbols and doc_symbols.root_symbols:
-                                print(f"  - Символов в файле: {len(doc_symbols.root_symbols)}")
-                                for symbol in doc_symbols.root_symbols:
-                                    symbol_name = getattr(symbol, 'name', 'Unknown')
-                                    print(f"    - {symbol_name}")
-                                    if procedure_name.lower() in symbol_name.lower():
-                                        print(f"      [MATCH] Найдено совпадение!")
-                            
-                            # Также проверяем дочерние символы
-                            def check_children(symbol, depth=0):
-                                indent = "  " * (depth + 1)
-                                if hasattr(symbol, 'children') and symbol.children:
-                                    for child in symbol.children:
-                                        child_name = getattr(child, 'name', 'Unknown')
-                                        print(f"{indent}- {child_name}")
-                                        if procedure_name.lower() in child_name.lower():
-                                            print(f"{indent}  [MATCH] Найдено совпадение!")
-                                        check_children(child, depth + 1)
-                            
+                        # Проверяем символы в этом файле
+                        if doc_symbols and doc_symbols.root_symbols:
+                            print(f"  - Символов в файле: {len(doc_symbols.root_symbols)}")
                             for symbol in doc_symbols.root_symbols:
-                                check_children(symbol)
-                            
-                            if target_file.replace("\\", "/") in file_path.replace("\\", "/"):
-                                break
+                                symbol_name = symbol["name"]
+                                print(f"    - {symbol_name}")
+                                if procedure_name_lower in symbol_name.lower():
+                                    print(f"      [MATCH] Найдено совпадение!")
+                        
+                        # Также проверяем дочерние символы (символы кеша - словари, поля читаем по ключу)
+                        def check_children(symbol, depth=0):
+                            indent = "  " * (depth + 1)
+                            for child in symbol.get("children", ()):
+                                child_name = child["name"]
+                                print(f"{indent}- {child_name}")
+                                if procedure_name_lower in child_name.lower():
+                                    print(f"{indent}  [MATCH] Найдено совпадение!")
+                                check_children(child, depth + 1)
+                        
+                        for symbol in doc_symbols.root_symbols:
+                            check_children(symbol)
                     
                     if not found_in_cache:
                         print(f"\n  [ERROR] Файл {target_file} не найден в кеше!")
-                        print(f"\n  Файлы в кеше (все):")
-                        for i, (cache_key, (file_hash, doc_symbols)) in enumerate(bsl_ls._document_symbols_cache.items()):
-                            if isinstance(cache_key, tuple):
-                                file_path = cache_key[0]
-                            else:
-                                file_path = cache_key
-                            print(f"    {i+1}. {file_path}")
+                        if bsl_verbose:
+                            print(f"\n  Файлы в кеше (все):")
+                            print(
+                                "\n".join(
+                                    f"    {i}. {file_path}" for i, file_path in enumerate(bsl_ls._document_symbols_cache, 1)
+                                )
+                            )
+                        else:
+                            print(f"\n  Полный список файлов кеша выводится при SERENA_TEST_VERBOSE=1")
                 
                 pytest.fail(f"Процедура '{procedure_name}' не найдена")
             
             # Выводим информацию о найденных символах
             print(f"\nНайденные символы:")
             for i, symbol in enumerate(symbols, 1):
-                print(f"\n  [{i}] {symbol.get('name', 'Unknown')}")
+                print(f"\n  [{i}] {symbol['name_path']}")
                 print(f"      Тип: {symbol.get('kind', 'Unknown')}")
                 print(f"      Файл: {symbol.get('relative_path', 'Unknown')}")
-                if 'start_line' in symbol:
-                    print(f"      Строка: {symbol.get('start_line', 'Unknown')}")
-                if 'body' in symbol and symbol['body']:
-                    body_preview = symbol['body'][:200].replace('\n', ' ')
-                    print(f"      Тело (первые 200 символов): {body_preview}...")
+                if 'body_location' in symbol:
+                    print(f"      Строка: {symbol['body_location']['start_line']}")
             
             # Проверяем, что нашли именно нужную процедуру
+            # (словари результата не содержат поля name, имя символа - последний сегмент name_path)
             found_procedure = False
             for symbol in symbols:
-                if symbol.get('name') == procedure_name:
+                if symbol['name_path'].rsplit('/', 1)[-1] == procedure_name:
                     found_procedure = True
                     print(f"\n[OK] Процедура '{procedure_name}' найдена!")
                     print(f"     Файл: {symbol.get('relative_path', 'Unknown')}")
-                    if 'start_line' in symbol:
-                        print(f"     Строка: {symbol.get('start_line', 'Unknown')}")
+                    if 'body_location' in symbol:
+                        print(f"     Строка: {symbol['body_location']['start_line']}")
                     break
             
             if not found_procedure:
                 print(f"\n[WARNING] Процедура с точным именем '{procedure_name}' не найдена, но найдены похожие:")
                 for symbol in symbols:
-                    print(f"  - {symbol.get('name', 'Unknown')}")
+                    print(f"  - {symbol['name_path']}")
             
             assert len(symbols) > 0, f"Процедура '{procedure_name}' не найдена"
             
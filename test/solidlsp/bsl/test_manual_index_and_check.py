@@ -3,24 +3,31 @@
 """
 
 import os
-import time
-from pathlib import Path
+import re
 
 import pytest
 
 from serena.agent import SerenaAgent
+from solidlsp.ls_config import Language
+
+# Сколько файлов кеша выводить при отсутствии целевого файла без SERENA_TEST_VERBOSE
+_CACHE_LISTING_LIMIT = 50
 
 
 @pytest.mark.bsl
-def test_manual_index_and_check_procedure():
+def test_manual_index_and_check_procedure(bsl_project_paths, bsl_verbose: bool):
     """Ручной запуск индексации и проверка наличия процедуры в кеше."""
     procedure_name = "УстановитьОграничениеТиповЭлементовАналитикПремирования"
+    procedure_name_lower = procedure_name.lower()  # приводим искомое имя к нижнему регистру один раз
+    # Похожие имена (только для диагностики, найденной процедурой не считаются): прямые проверки вхождения
+    # объединены в одно регулярное выражение (имя процедуры - без учета регистра, фрагменты имени - с учетом регистра)
+    procedure_matcher = re.compile(f"(?i:{re.escape(procedure_name)})|ОграничениеТипов|АналитикПремирования")
     target_file = "src/cf/CommonModules/ibs_МодульПремированияКлиентСервер/Ext/Module.bsl"
     
     # Путь к проекту
-    project_path = Path(r"D:\1C\BASE")
-    if not project_path.exists():
-        pytest.skip(f"Test project not found at {project_path}")
+    project_path = bsl_project_paths["BASE"]
+    if project_path is None:
+        pytest.skip("Test project BASE not found")
     
     print(f"\n{'='*80}")
     print(f"Ручной запуск индексации и проверка кеша")
@@ -33,29 +40,16 @@ def test_manual_index_and_check_procedure():
     # Ждем инициализации менеджера языковых серверов
     print("\nОжидание инициализации language server manager...")
     max_wait = 60
-    wait_interval = 1
-    elapsed = 0
-    ls_manager = None
-    
-    while elapsed < max_wait:
-        ls_manager = agent.get_language_server_manager()
-        if ls_manager is not None:
-            print(f"[OK] Language server manager инициализирован")
-            break
-        time.sleep(wait_interval)
-        elapsed += wait_interval
-        print(f"  Ожидание... ({elapsed}s)")
+    ls_manager = agent.wait_for_language_server_manager(timeout=max_wait)
     
     if ls_manager is None:
-        pytest.fail(f"Language server manager not initialized after {elapsed}s")
+        pytest.fail(f"Language server manager not initialized after {max_wait}s")
+    print(f"[OK] Language server manager инициализирован")
     
     # Находим BSL language server
     from solidlsp.language_servers.bsl_language_server import BSLLanguageServer
-    bsl_ls: BSLLanguageServer | None = None
-    for ls in ls_manager.iter_language_servers():
-        if isinstance(ls, BSLLanguageServer):
-            bsl_ls = ls
-            break
+    bsl_ls = ls_manager.get_language_server_for_language(Language.BSL)
+    assert bsl_ls is None or isinstance(bsl_ls, BSLLanguageServer)
     
     if bsl_ls is None:
         pytest.fail("BSL language server not found")
@@ -94,17 +88,9 @@ def test_manual_index_and_check_procedure():
     bsl_files = []
     
     if os.path.exists(src_cf_dir):
-        for root, dirs, files in os.walk(src_cf_dir):
-            # Пропускаем игнорируемые директории
-            dirs[:] = [d for d in dirs if not bsl_ls.is_ignored_dirname(d)]
-            
-            for file in files:
-                if file.endswith('.bsl'):
-                    abs_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(abs_path, project.project_root)
-                    # Нормализуем путь для Windows
-                    rel_path = rel_path.replace('\\', '/')
-                    bsl_files.append((rel_path, abs_path))
+        # Обход через os.scandir языкового сервера: игнорируемые директории пропускаются,
+        # пути уже относительны корню проекта и нормализованы с '/'
+        bsl_files = list(bsl_ls._iter_bsl_files(src_cf_dir))
     
     print(f"Найдено BSL файлов в src/cf: {len(bsl_files)}")
     
@@ -156,62 +142,74 @@ def test_manual_index_and_check_procedure():
     # Ищем файл в кеше
     found_file = False
     found_procedure = False
+    # Список файлов кеша для диагностики собирается в том же проходе, пока файл не найден
+    # (без SERENA_TEST_VERBOSE - только первые _CACHE_LISTING_LIMIT файлов)
+    cache_listing: list[str] = []
     
     print(f"\nПроверка всех файлов в кеше:")
-    for cache_key, (file_hash, doc_symbols) in bsl_ls._document_symbols_cache.items():
-        if isinstance(cache_key, tuple):
-            file_path = cache_key[0]
-        else:
-            file_path = cache_key
+    for i, (file_path, (file_hash, doc_symbols)) in enumerate(bsl_ls._document_symbols_cache.items(), 1):
+        if not found_file and (bsl_verbose or i <= _CACHE_LISTING_LIMIT):
+            symbol_count = len(doc_symbols.root_symbols) if doc_symbols and doc_symbols.root_symbols else 0
+            cache_listing.append(f"  {i}. {file_path} ({symbol_count} символов)")
         
-        # Проверяем все файлы, содержащие "МодульПремирования"
-        if "МодульПремирования" in file_path or "ibs_МодульПремирования" in file_path or "Премирования" in file_path:
+        # Проверяем все файлы, содержащие "Премирования" (в том числе "МодульПремирования" и "ibs_МодульПремирования")
+        if "Премирования" in file_path:
             found_file = True
             print(f"\n[OK] Файл найден в кеше: {file_path}")
             
             if doc_symbols and doc_symbols.root_symbols:
                 print(f"  - Символов в файле: {len(doc_symbols.root_symbols)}")
                 
-                def search_symbols(symbols, depth=0):
-                    nonlocal found_procedure
+                # Обход дерева символов явным стеком вместо рекурсии (дочерние символы кладутся
+                # в обратном порядке, чтобы сохранить порядок вывода)
+                # Строки диагностики собираются и выводятся одним вызовом print
+                report: list[str] = []
+                stack = [(symbol, 0) for symbol in reversed(doc_symbols.root_symbols)]
+                while stack:
+                    symbol, depth = stack.pop()
                     indent = "  " * (depth + 1)
-                    for symbol in symbols:
-                        symbol_name = getattr(symbol, 'name', 'Unknown')
-                        symbol_kind = getattr(symbol, 'kind', 'Unknown')
-                        
-                        # Более гибкий поиск
-                        if (procedure_name.lower() in symbol_name.lower() or 
-                            symbol_name.lower() in procedure_name.lower() or
-                            "ОграничениеТипов" in symbol_name or
-                            "АналитикПремирования" in symbol_name):
-                            found_procedure = True
-                            print(f"{indent}[MATCH] {symbol_name} (kind: {symbol_kind})")
-                            if hasattr(symbol, 'start_line'):
-                                print(f"{indent}       Строка: {symbol.start_line}")
-                            if hasattr(symbol, 'children') and symbol.children:
-                                print(f"{indent}       Дочерних символов: {len(symbol.children)}")
-                        else:
-                            # Показываем все символы для диагностики
-                            print(f"{indent}- {symbol_name} (kind: {symbol_kind})")
-                        
-                        if hasattr(symbol, 'children') and symbol.children:
-                            search_symbols(symbol.children, depth + 1)
-                
-                search_symbols(doc_symbols.root_symbols)
+                    # символы кеша - словари, поля читаем по ключу
+                    symbol_name = symbol["name"]
+                    symbol_kind = symbol["kind"]
+                    children = symbol.get("children")
+                    symbol_name_lower = symbol_name.lower()
+                    
+                    # Процедура считается найденной только при точном совпадении имени (без учета регистра)
+                    if symbol_name_lower == procedure_name_lower:
+                        found_procedure = True
+                        report.append(f"{indent}[MATCH] {symbol_name} (kind: {symbol_kind})")
+                        if "range" in symbol:
+                            report.append(f"{indent}       Строка: {symbol['range']['start']['line']}")
+                        if children:
+                            report.append(f"{indent}       Дочерних символов: {len(children)}")
+                        # процедура найдена - дальше по дереву не идем
+                        break
+                    
+                    # Похожие имена (в том числе имя символа как часть искомого имени) выводим для диагностики,
+                    # все остальные просмотренные символы - только в подробном режиме
+                    if symbol_name and (procedure_matcher.search(symbol_name) or symbol_name_lower in procedure_name_lower):
+                        report.append(f"{indent}[SIMILAR] {symbol_name} (kind: {symbol_kind})")
+                    elif bsl_verbose:
+                        report.append(f"{indent}- {symbol_name} (kind: {symbol_kind})")
+                    if children:
+                        stack.extend((child, depth + 1) for child in reversed(children))
+                if report:
+                    print("\n".join(report))
             else:
                 print(f"  [WARNING] Символы отсутствуют в файле")
+            
+            # Процедура найдена - остальные записи кеша не просматриваем
+            if found_procedure:
+                break
     
-    # Если не нашли, показываем все файлы в кеше
+    # Если не нашли, показываем файлы в кеше
     if not found_file:
         print(f"\n[WARNING] Файл с 'МодульПремирования' не найден в кеше")
-        print(f"\nВсе файлы в кеше ({len(bsl_ls._document_symbols_cache)}):")
-        for i, (cache_key, (file_hash, doc_symbols)) in enumerate(bsl_ls._document_symbols_cache.items(), 1):
-            if isinstance(cache_key, tuple):
-                file_path = cache_key[0]
-            else:
-                file_path = cache_key
-            symbol_count = len(doc_symbols.root_symbols) if doc_symbols and doc_symbols.root_symbols else 0
-            print(f"  {i}. {file_path} ({symbol_count} символов)")
+        cache_size = len(bsl_ls._document_symbols_cache)
+        print(f"\nФайлы в кеше ({cache_size}):")
+        print("\n".join(cache_listing))
+        if len(cache_listing) < cache_size:
+            print(f"  ... (полный список выводится при SERENA_TEST_VERBOSE=1)")
     
     print(f"\n{'='*80}")
     print(f"Итоги:")
@@ -0,0 +1,56 @@
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+from solidlsp.util.cache import STALE_TEMP_FILE_AGE_SECONDS, load_cache, save_cache
+
+
+def test_save_and_load_roundtrip(tmp_path: Path) -> None:
+    """A saved cache should load back with the same version and be ignored with another version."""
+    cache_path = str(tmp_path / "cache" / "symbols.pkl")
+    save_cache(cache_path, 2, {"a": [1, 2]})
+
+    assert load_cache(cache_path, 2) == {"a": [1, 2]}
+    assert load_cache(cache_path, 3) is None
+    assert [p.name for p in (tmp_path / "cache").iterdir()] == ["symbols.pkl"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX file modes")
+def test_save_uses_umask_file_mode(tmp_path: Path) -> None:
+    """New cache files should get the umask-based mode of regular files, not the owner-only mode of mkstemp."""
+    umask = os.umask(0)
+    os.umask(umask)
+    cache_path = tmp_path / "symbols.pkl"
+    save_cache(str(cache_path), 1, "data")
+
+    assert stat.S_IMODE(cache_path.stat().st_mode) == 0o666 & ~umask
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX file modes")
+def test_save_keeps_mode_of_existing_file(tmp_path: Path) -> None:
+    cache_path = tmp_path / "symbols.pkl"
+    save_cache(str(cache_path), 1, "data")
+    cache_path.chmod(0o640)
+
+    save_cache(str(cache_path), 1, "new data")
+
+    assert stat.S_IMODE(cache_path.stat().st_mode) == 0o640
+    assert load_cache(str(cache_path), 1) == "new data"
+
+
+def test_save_removes_stale_temp_files(tmp_path: Path) -> None:
+    """Temporary files of interrupted saves should be removed once stale, recent ones kept."""
+    stale_tmp = tmp_path / "symbols.pkl.abc.tmp"
+    recent_tmp = tmp_path / "symbols.pkl.def.tmp"
+    stale_tmp.write_bytes(b"partial")
+    recent_tmp.write_bytes(b"partial")
+    stale_time = os.path.getmtime(stale_tmp) - STALE_TEMP_FILE_AGE_SECONDS - 1
+    os.utime(stale_tmp, (stale_time, stale_time))
+
+    save_cache(str(tmp_path / "symbols.pkl"), 1, "data")
+
+    assert not stale_tmp.exists()
+    assert recent_tmp.exists()